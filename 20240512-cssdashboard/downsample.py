@@ -0,0 +1,84 @@
+"""Downsampling of price histories to what a chart can show, before building its figure.
+
+A chart can't draw more points than its width has pixels, yet every point
+of a history is serialized, sent and laid out by the browser. Both functions
+bound that to a budget set per chart, whatever the history length:
+
+- `lttb` keeps the points of a line that shape it most, with
+  Largest-Triangle-Three-Buckets.
+- `downsample_ohlc` merges consecutive rows into candles: first open,
+  highest high, lowest low, last close and total volume of each bucket.
+
+Histories within their budget are returned unchanged.
+"""
+
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+OHLCV_COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+
+
+def lttb(x, y, max_points: int) -> np.ndarray:
+    """Positions of the `max_points` points of the line (`x`, `y`) that best keep its shape.
+
+    The first and last points are always kept. The others are split into
+    equal buckets, and each bucket keeps the point forming the largest
+    triangle with the point kept before it and the average of the next bucket.
+    """
+    n = len(y)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+
+    # max_points - 2 buckets between the first and last points, none of them empty
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.intp)
+    edges = np.append(edges, n)
+    kept = np.empty(max_points, dtype=np.intp)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for i in range(max_points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = edges[i + 1], edges[i + 2]
+        next_x = x[next_lo:next_hi].mean()
+        next_y = y[next_lo:next_hi]
+        next_y = next_y[~np.isnan(next_y)].mean() if not np.isnan(next_y).all() else np.nan
+        # Twice the triangle areas, the factor doesn't change which one is largest
+        areas = np.abs(
+            (x[previous] - next_x) * (y[lo:hi] - y[previous])
+            - (x[previous] - x[lo:hi]) * (next_y - y[previous])
+        )
+        previous = lo + int(np.argmax(np.nan_to_num(areas, nan=-1.0)))
+        kept[i + 1] = previous
+    return kept
+
+
+def downsample_ohlc(
+    history_df: pd.DataFrame,
+    max_candles: int,
+    columns: Tuple[str, str, str, str, str] = OHLCV_COLUMNS,
+) -> pd.DataFrame:
+    """`history_df`, sorted by its index, merged into at most `max_candles` rows.
+
+    Each row covers consecutive rows of equal count, give or take one, and is
+    indexed by the first of them. `columns` names the open, high, low, close
+    and volume columns, the workbook's by default.
+    """
+    n = len(history_df)
+    if n <= max_candles:
+        return history_df
+    open_col, high_col, low_col, close_col, volume_col = columns
+    starts = np.linspace(0, n, max_candles, endpoint=False).astype(np.intp)
+    ends = np.append(starts[1:], n) - 1
+    return pd.DataFrame(
+        {
+            open_col: history_df[open_col].to_numpy()[starts],
+            high_col: np.fmax.reduceat(history_df[high_col].to_numpy(), starts),
+            low_col: np.fmin.reduceat(history_df[low_col].to_numpy(), starts),
+            close_col: history_df[close_col].to_numpy()[ends],
+            volume_col: np.add.reduceat(history_df[volume_col].to_numpy(), starts),
+        },
+        index=history_df.index[starts],
+    )
@@ -0,0 +1,131 @@
+"""Period windows and period metrics of a ticker's history, without touching its frame.
+
+PeriodIndex is built once per ticker from its dates, sorted ascending, and its
+Volume and Close columns. Finding the rows of a Week/Month/Trimester/Year
+window is then a binary search over the dates. The window's lowest and highest
+volume and close come from segment trees, in logarithmic time and linear
+memory, and its average volume from prefix sums, in constant time.
+
+Missing values are skipped, as pandas' min, max and mean do.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+PERIOD_DAYS = {"Week": 7, "Month": 31, "Trimester": 90, "Year": 365}
+
+
+class SegmentTree:
+    """Min and max of any range of `values` in O(log n), in O(n) memory.
+
+    Level k + 1 holds the min and max of every pair of nodes of level k, the
+    last node carried over alone when level k has an odd count. A range is
+    covered by at most two nodes per level, taken bottom-up.
+    """
+
+    def __init__(self, values: np.ndarray):
+        self.mins = [values]
+        self.maxs = [values]
+        while len(self.mins[-1]) > 1:
+            self.mins.append(self._pairs(np.fmin, self.mins[-1]))
+            self.maxs.append(self._pairs(np.fmax, self.maxs[-1]))
+
+    @staticmethod
+    def _pairs(ufunc, level: np.ndarray) -> np.ndarray:
+        even = len(level) - len(level) % 2
+        parents = ufunc(level[0:even:2], level[1:even:2])
+        return np.append(parents, level[even:]) if even < len(level) else parents
+
+    @staticmethod
+    def _query(ufunc, levels, lo: int, hi: int):
+        # Nodes are combined with each other only, so results keep the dtype of `values`
+        nodes = []
+        for level in levels:
+            if hi <= lo:
+                break
+            if lo % 2:
+                nodes.append(level[lo])
+                lo += 1
+            if hi % 2:
+                hi -= 1
+                nodes.append(level[hi])
+            lo //= 2
+            hi //= 2
+        return ufunc.reduce(nodes) if nodes else np.nan
+
+    def min(self, lo: int, hi: int):
+        return self._query(np.fmin, self.mins, lo, hi)
+
+    def max(self, lo: int, hi: int):
+        return self._query(np.fmax, self.maxs, lo, hi)
+
+
+class PrefixSums:
+    """Sum and mean of any range of `values` in O(1)."""
+
+    def __init__(self, values: np.ndarray):
+        present = ~pd.isna(values)
+        self.sums = np.concatenate([[0], np.cumsum(np.where(present, values, 0))])
+        self.counts = np.concatenate([[0], np.cumsum(present)])
+
+    def mean(self, lo: int, hi: int) -> float:
+        count = self.counts[hi] - self.counts[lo] if hi > lo else 0
+        if not count:
+            return np.nan
+        return (self.sums[hi] - self.sums[lo]) / count
+
+
+@dataclass(frozen=True)
+class PeriodMetrics:
+    lowest_volume: float
+    highest_volume: float
+    lowest_close: float
+    highest_close: float
+    average_volume: float
+
+
+class PeriodIndex:
+    """Window lookups and metrics over one ticker's history, sorted by date.
+
+    `offset` is the position of the ticker's first row in the table its
+    columns were taken from, for histories of several tickers in one table.
+    """
+
+    def __init__(self, dates, volume, close, offset: int = 0):
+        self.dates = np.asarray(dates, dtype="datetime64[ns]")
+        self.offset = offset
+        volume = np.asarray(volume)
+        close = np.asarray(close)
+        self._volume_extrema = SegmentTree(volume)
+        self._volume_sums = PrefixSums(volume)
+        self._close_extrema = SegmentTree(close)
+
+    def __len__(self):
+        return len(self.dates)
+
+    def rows(
+        self,
+        start: Optional[pd.Timestamp] = None,
+        end: Optional[pd.Timestamp] = None,
+    ) -> Tuple[int, int]:
+        """Positions `lo, hi` of the rows dated between `start` and `end` included."""
+        lo = 0 if start is None else int(self.dates.searchsorted(pd.Timestamp(start).to_datetime64(), "left"))
+        hi = len(self.dates) if end is None else int(self.dates.searchsorted(pd.Timestamp(end).to_datetime64(), "right"))
+        return lo, max(lo, hi)
+
+    def window(self, period: str, today: pd.Timestamp) -> Tuple[int, int]:
+        """Rows of the `period` ending `today`, one of PERIOD_DAYS."""
+        return self.rows(today - pd.Timedelta(days=PERIOD_DAYS[period]), today)
+
+    def metrics(self, lo: int, hi: int) -> PeriodMetrics:
+        return PeriodMetrics(
+            lowest_volume=self._volume_extrema.min(lo, hi),
+            highest_volume=self._volume_extrema.max(lo, hi),
+            lowest_close=self._close_extrema.min(lo, hi),
+            highest_close=self._close_extrema.max(lo, hi),
+            average_volume=self._volume_sums.mean(lo, hi),
+        )
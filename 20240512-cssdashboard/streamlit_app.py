@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.io as pio
@@ -6,6 +7,12 @@ from datetime import datetime
 from itertools import islice
 from plotly.subplots import make_subplots
 
+from downsample import downsample_ohlc
+from downsample import lttb
+from figure_cache import FigureCache
+from period_index import PERIOD_DAYS
+from tick_store import TickStore
+
 
 ##################################################################
 ### Configure App
@@ -15,6 +22,11 @@ st.set_page_config(page_title="Stocks Dashboard", page_icon="💹", layout="wide
 st.html("styles.html")
 pio.templates.default = "plotly_white"
 
+# Points a chart is drawn with at most, however long the history it shows:
+# about one per pixel of a watchlist sparkline, one candle per 3 pixels
+SPARKLINE_MAX_POINTS = 200
+CANDLESTICK_MAX_CANDLES = 300
+
 
 # from itertools.batched, used to produce rows of columns
 def batched(iterable, n_cols):
@@ -31,54 +43,32 @@ def batched(iterable, n_cols):
 ##################################################################
 
 
-@st.cache_data
-def download_data():
-    dfs = pd.read_excel("./Stock Dashboard.xlsx", sheet_name=None)
-
-    history_dfs = {}
-    ticker_df = dfs["ticker"].copy(deep=True)
+# The workbook is converted once into per-ticker Arrow files (see tick_store.py),
+# runs then read the tickers and date ranges they show through memory maps
+@st.cache_resource
+def open_tick_store():
+    return TickStore()
 
-    for ticker in list(ticker_df["Ticker"]):
-        d = dfs[ticker]
-        history_dfs[ticker] = d
 
-    return ticker_df, history_dfs
+# Figures are shared by every session too, keyed by what they are drawn from
+@st.cache_resource
+def get_figure_cache():
+    return FigureCache()
 
 
+# store_version changes when the workbook does, which invalidates the cache
 @st.cache_data
-def transform_data(ticker_df, history_dfs):
-    ticker_df["Last Trade time"] = pd.to_datetime(
-        ticker_df["Last Trade time"], dayfirst=True
-    )
-
-    for c in [
-        "Last Price",
-        "Previous Day Price",
-        "Change",
-        "Change Pct",
-        "Volume",
-        "Volume Avg",
-        "Shares",
-        "Day High",
-        "Day Low",
-        "Market Cap",
-        "P/E Ratio",
-        "EPS",
-    ]:
-        ticker_df[c] = pd.to_numeric(ticker_df[c], "coerce")
-
-    for ticker in list(ticker_df["Ticker"]):
-        history_dfs[ticker]["Date"] = pd.to_datetime(
-            history_dfs[ticker]["Date"], dayfirst=True
-        )
+def download_data(_store, store_version):
+    return _store.tickers()
 
-        for c in ["Open", "High", "Low", "Close", "Volume"]:
-            history_dfs[ticker][c] = pd.to_numeric(history_dfs[ticker][c])
 
-    ticker_to_open = [list(history_dfs[t]["Open"]) for t in list(ticker_df["Ticker"])]
-    ticker_df["Open"] = ticker_to_open
+@st.cache_data
+def transform_data(ticker_df, _store, store_version):
+    # Types were already cleaned up when the workbook was ingested, and the
+    # sparklines of all tickers computed there with a single groupby
+    ticker_df["Open"] = ticker_df["Ticker"].map(_store.sparklines())
 
-    return ticker_df, history_dfs
+    return ticker_df
 
 
 ##################################################################
@@ -86,10 +76,12 @@ def transform_data(ticker_df, history_dfs):
 ##################################################################
 
 
-def plot_sparkline(data):
+def plot_sparkline(data, max_points=SPARKLINE_MAX_POINTS):
+    kept = lttb(np.arange(len(data)), data, max_points)
     fig_spark = go.Figure(
         data=go.Scatter(
-            y=data,
+            x=kept,
+            y=np.asarray(data)[kept],
             mode="lines",
             fill="tozeroy",
             line_color="red",
@@ -137,7 +129,9 @@ def display_watchlist_card(ticker, symbol_name, last_price, change_pct, open):
                 st.markdown(f"$ {last_price:.2f}")
 
         with br:
-            fig_spark = plot_sparkline(open)
+            fig_spark = figure_cache.get_or_build(
+                ("sparkline", ticker, store_version), lambda: plot_sparkline(open)
+            )
             st.html(f'<span class="watchlist_br"></span>')
             st.plotly_chart(
                 fig_spark, config=dict(displayModeBar=False), use_container_width=True
@@ -166,17 +160,15 @@ def filter_symbol_widget():
     with st.container():
         left_widget, right_widget, _ = st.columns([1, 1, 3])
 
-    selected_ticker = left_widget.selectbox(
-        "📰 Currently Showing", list(history_dfs.keys())
-    )
-    selected_period = right_widget.selectbox(
-        "⌚ Period", ("Week", "Month", "Trimester", "Year"), 2
-    )
+    selected_ticker = left_widget.selectbox("📰 Currently Showing", all_symbols)
+    selected_period = right_widget.selectbox("⌚ Period", tuple(PERIOD_DAYS), 2)
 
     return selected_ticker, selected_period
 
 
-def plot_candlestick(history_df):
+def plot_candlestick(history_df, max_candles=CANDLESTICK_MAX_CANDLES):
+    history_df = downsample_ohlc(history_df, max_candles)
+
     f_candle = make_subplots(
         rows=2,
         cols=1,
@@ -225,25 +217,25 @@ def plot_candlestick(history_df):
 
 
 @st.experimental_fragment
-def display_symbol_history(ticker_df, history_dfs):
+def display_symbol_history(ticker_df, store):
     selected_ticker, selected_period = filter_symbol_widget()
 
-    history_df = history_dfs[selected_ticker]
-
-    history_df["Date"] = pd.to_datetime(history_df["Date"], dayfirst=True)
-    history_df = history_df.set_index("Date")
-    mapping_period = {"Week": 7, "Month": 31, "Trimester": 90, "Year": 365}
-    today = datetime.today().date()
-    history_df = history_df[
-        (today - pd.Timedelta(mapping_period[selected_period], unit="d")) : today
-    ]
-
-    for c in ["Open", "High", "Low", "Close", "Volume"]:
-        history_df[c] = pd.to_numeric(history_df[c])
+    # Switching ticker or period is a binary search in the ticker's date index,
+    # its metrics are read from tables precomputed over the whole history
+    today = pd.Timestamp(datetime.today().date())
+    period_index = store.period_index(selected_ticker)
+    lo, hi = period_index.window(selected_period, today)
+    metrics = period_index.metrics(lo, hi)
 
     left_chart, right_indicator = st.columns([1.5, 1])
 
-    f_candle = plot_candlestick(history_df)
+    # The window's rows are only read when its chart isn't cached yet
+    f_candle = figure_cache.get_or_build(
+        ("candlestick", selected_ticker, selected_period, today, store.version),
+        lambda: plot_candlestick(
+            store.history_rows(selected_ticker, lo, hi).set_index("Date")
+        ),
+    )
 
     with left_chart:
         st.html('<span class="column_plotly"></span>')
@@ -256,16 +248,16 @@ def display_symbol_history(ticker_df, history_dfs):
 
         with l:
             st.html('<span class="low_indicator"></span>')
-            st.metric("Lowest Volume Day Trade", f'{history_df["Volume"].min():,}')
-            st.metric("Lowest Close Price", f'{history_df["Close"].min():,} $')
+            st.metric("Lowest Volume Day Trade", f"{metrics.lowest_volume:,}")
+            st.metric("Lowest Close Price", f"{metrics.lowest_close:,} $")
         with r:
             st.html('<span class="high_indicator"></span>')
-            st.metric("Highest Volume Day Trade", f'{history_df["Volume"].max():,}')
-            st.metric("Highest Close Price", f'{history_df["Close"].max():,} $')
+            st.metric("Highest Volume Day Trade", f"{metrics.highest_volume:,}")
+            st.metric("Highest Close Price", f"{metrics.highest_close:,} $")
 
         with st.container():
             st.html('<span class="bottom_indicator"></span>')
-            st.metric("Average Daily Volume", f'{int(history_df["Volume"].mean()):,}')
+            st.metric("Average Daily Volume", f"{int(metrics.average_volume):,}")
             st.metric(
                 "Current Market Cap",
                 "{:,} $".format(
@@ -321,8 +313,12 @@ def display_overview(ticker_df):
 ### Main App
 ##################################################################
 
-ticker_df, history_dfs = download_data()
-ticker_df, history_dfs = transform_data(ticker_df, history_dfs)
+# Every read of this run, fragment reruns included, goes to the same store version
+tick_store = open_tick_store().refresh()
+store_version = tick_store.version
+figure_cache = get_figure_cache()
+ticker_df = download_data(tick_store, store_version)
+ticker_df = transform_data(ticker_df, tick_store, store_version)
 all_symbols = list(ticker_df["Ticker"])
 
 st.html('<h1 class="title">Stocks Dashboard</h1>')
@@ -331,5 +327,5 @@ display_watchlist(ticker_df)
 
 st.divider()
 
-display_symbol_history(ticker_df, history_dfs)
+display_symbol_history(ticker_df, tick_store)
 display_overview(ticker_df)
@@ -1,5 +1,6 @@
 import json
 import airbyte as ab
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
@@ -7,6 +8,12 @@ from datetime import datetime
 from itertools import islice
 from plotly.subplots import make_subplots
 
+from downsample import downsample_ohlc
+from downsample import lttb
+from figure_cache import FigureCache
+from period_index import PERIOD_DAYS
+from period_index import PeriodIndex
+
 ##################################################################
 ### Configure App
 ##################################################################
@@ -17,6 +24,11 @@ st.html("styles.html")
 PATH_to_KEY = "<PATH_to_KEY>.json"
 URL_to_SPREADSHEET = "https://docs.google.com/spreadsheets/d/<ID>/edit#gid=0"
 
+# Points a chart is drawn with at most, however long the history it shows:
+# about one per pixel of a watchlist sparkline, one candle per 3 pixels
+SPARKLINE_MAX_POINTS = 200
+CANDLESTICK_MAX_CANDLES = 300
+
 
 # from itertools.batched, used to produce rows of columns
 def batched(iterable, n_cols):
@@ -60,6 +72,12 @@ def connect_to_gsheets():
     return gsheets_connection
 
 
+# Figures are shared by every session, keyed by what they are drawn from
+@st.cache_resource
+def get_figure_cache():
+    return FigureCache()
+
+
 @st.cache_data
 def download_data(_gsheets_connection):
     airbyte_streams = _gsheets_connection.read()
@@ -71,7 +89,10 @@ def download_data(_gsheets_connection):
         d = airbyte_streams[ticker].to_pandas()
         history_dfs[ticker] = d
 
-    return ticker_df, history_dfs
+    # Cached along with the data, changes only when it is downloaded again
+    data_version = datetime.now().isoformat()
+
+    return ticker_df, history_dfs, data_version
 
 
 @st.cache_data
@@ -81,7 +102,7 @@ def transform_data(ticker_df, history_dfs):
         dayfirst=True,
     )
 
-    for col in [
+    numeric_cols = [
         "last_price",
         "previous_day_price",
         "change",
@@ -94,25 +115,42 @@ def transform_data(ticker_df, history_dfs):
         "market_cap",
         "p/e_ratio",
         "eps",
-    ]:
-        ticker_df[col] = pd.to_numeric(
-            ticker_df[col],
-            "coerce",
-        )
+    ]
+    ticker_df[numeric_cols] = ticker_df[numeric_cols].apply(pd.to_numeric, errors="coerce")
+
+    # All tickers stacked into one long table, so each column is converted once
+    history_df = pd.concat(
+        {t: history_dfs[t] for t in list(ticker_df["ticker"])},
+        names=["ticker", None],
+    ).reset_index(level="ticker")
+    history_df["date"] = pd.to_datetime(
+        history_df["date"],
+        dayfirst=True,
+    )
+    history_cols = ["open", "high", "low", "close", "volume"]
+    history_df[history_cols] = history_df[history_cols].apply(pd.to_numeric)
+    history_df = history_df.sort_values(["ticker", "date"], kind="stable", ignore_index=True)
 
-    for ticker in list(ticker_df["ticker"]):
-        history_dfs[ticker]["date"] = pd.to_datetime(
-            history_dfs[ticker]["date"],
-            dayfirst=True,
-        )
+    ticker_df["open"] = ticker_df["ticker"].map(
+        history_df.groupby("ticker", sort=False)["open"].agg(list)
+    )
 
-        for col in ["open", "high", "low", "close", "volume"]:
-            history_dfs[ticker][col] = pd.to_numeric(history_dfs[ticker][col])
+    return ticker_df, history_df.set_index("ticker")
 
-    ticker_to_open = [list(history_dfs[t]["open"]) for t in list(ticker_df["ticker"])]
-    ticker_df["open"] = ticker_to_open
 
-    return ticker_df, history_dfs
+# A resource rather than cached data: cache_data would unpickle a copy of every
+# index on each rerun. Built once per download for the tickers actually shown.
+@st.cache_resource
+def get_period_index(_history_df, data_version, ticker):
+    # Rows are sorted by ticker, so each ticker's rows follow each other
+    start, stop = _history_df.index.slice_locs(ticker, ticker)
+    rows = _history_df.iloc[start:stop]
+    return PeriodIndex(
+        rows["date"].to_numpy(),
+        rows["volume"].to_numpy(),
+        rows["close"].to_numpy(),
+        offset=start,
+    )
 
 
 ##################################################################
@@ -169,19 +207,20 @@ def display_overview(ticker_df):
     )
 
 
-def filter_history_df(selected_ticker, selected_period, history_dfs):
-    history_df = history_dfs[selected_ticker]
+def filter_history_df(period_index, lo, hi, history_df):
+    start = period_index.offset
+    history_df = history_df.iloc[start + lo : start + hi]
 
-    history_df = history_df.set_index("date")
-    mapping_period = {"Week": 7, "Month": 31, "Trimester": 90, "Year": 365}
-    today = datetime.today().date()
-    delay_days = mapping_period[selected_period]
-    history_df = history_df[(today - pd.Timedelta(delay_days, unit="d")) : today]
+    return history_df.set_index("date")
 
-    return history_df
 
+def plot_candlestick(history_df, max_candles=CANDLESTICK_MAX_CANDLES):
+    history_df = downsample_ohlc(
+        history_df,
+        max_candles,
+        columns=("open", "high", "low", "close", "volume"),
+    )
 
-def plot_candlestick(history_df):
     f_candle = make_subplots(
         rows=2,
         cols=1,
@@ -229,27 +268,38 @@ def plot_candlestick(history_df):
 
 
 @st.experimental_fragment
-def display_symbol_history(ticker_df, history_dfs):
+def display_symbol_history(ticker_df, history_df):
     left_widget, right_widget, _ = st.columns([1, 1, 1.5])
 
     selected_ticker = left_widget.selectbox(
         "📰 Currently Showing",
-        list(history_dfs.keys()),
+        list(ticker_df["ticker"]),
     )
     selected_period = right_widget.selectbox(
         "⌚ Period",
-        ("Week", "Month", "Trimester", "Year"),
+        tuple(PERIOD_DAYS),
         2,
     )
 
-    history_df = filter_history_df(
-        selected_ticker,
-        selected_period,
-        history_dfs,
+    # A binary search in the ticker's date index, metrics come precomputed
+    period_index = get_period_index(history_df, data_version, selected_ticker)
+    today = pd.Timestamp(datetime.today().date())
+    lo, hi = period_index.window(selected_period, today)
+    metrics = period_index.metrics(lo, hi)
+
+    # The window's rows are only taken when its chart isn't cached yet
+    f_candle = figure_cache.get_or_build(
+        ("candlestick", selected_ticker, selected_period, today, data_version),
+        lambda: plot_candlestick(
+            filter_history_df(
+                period_index,
+                lo,
+                hi,
+                history_df,
+            )
+        ),
     )
 
-    f_candle = plot_candlestick(history_df)
-
     left_chart, right_indicator = st.columns([1.5, 1])
 
     with left_chart:
@@ -265,29 +315,29 @@ def display_symbol_history(ticker_df, history_dfs):
             st.html('<span class="low_indicator"></span>')
             st.metric(
                 "Lowest Volume Day Trade",
-                f'{history_df["volume"].min():,}',
+                f"{metrics.lowest_volume:,}",
             )
             st.metric(
                 "Lowest Close Price",
-                f'{history_df["close"].min():,} $',
+                f"{metrics.lowest_close:,} $",
             )
 
         with r:
             st.html('<span class="high_indicator"></span>')
             st.metric(
                 "Highest Volume Day Trade",
-                f'{history_df["volume"].max():,}',
+                f"{metrics.highest_volume:,}",
             )
             st.metric(
                 "Highest Close Price",
-                f'{history_df["close"].max():,} $',
+                f"{metrics.highest_close:,} $",
             )
 
         with st.container():
             st.html('<span class="bottom_indicator"></span>')
             st.metric(
                 "Average Daily Volume",
-                f'{int(history_df["volume"].mean()):,}',
+                f"{int(metrics.average_volume):,}",
             )
             st.metric(
                 "Current Market Cap",
@@ -299,10 +349,12 @@ def display_symbol_history(ticker_df, history_dfs):
             )
 
 
-def plot_sparkline(data):
+def plot_sparkline(data, max_points=SPARKLINE_MAX_POINTS):
+    kept = lttb(np.arange(len(data)), data, max_points)
     fig_spark = go.Figure(
         data=go.Scatter(
-            y=data,
+            x=kept,
+            y=np.asarray(data)[kept],
             mode="lines",
             fill="tozeroy",
             line_color="red",
@@ -355,7 +407,10 @@ def display_watchlist_card(ticker, symbol_name, last_price, change_pct, open):
 
         with br:
             st.html(f'<span class="watchlist_br"></span>')
-            fig_spark = plot_sparkline(open)
+            fig_spark = figure_cache.get_or_build(
+                ("sparkline", ticker, data_version),
+                lambda: plot_sparkline(open),
+            )
             st.plotly_chart(
                 fig_spark,
                 config=dict(displayModeBar=False),
@@ -385,8 +440,9 @@ def display_watchlist(ticker_df):
 ##################################################################
 
 gsheets_connection = connect_to_gsheets()
-ticker_df, history_dfs = download_data(gsheets_connection)
-ticker_df, history_dfs = transform_data(ticker_df, history_dfs)
+figure_cache = get_figure_cache()
+ticker_df, history_dfs, data_version = download_data(gsheets_connection)
+ticker_df, history_df = transform_data(ticker_df, history_dfs)
 
 st.html('<h1 class="title">Stocks Dashboard</h1>')
 
@@ -394,5 +450,5 @@ display_watchlist(ticker_df)
 
 st.divider()
 
-display_symbol_history(ticker_df, history_dfs)
+display_symbol_history(ticker_df, history_df)
 display_overview(ticker_df)
@@ -0,0 +1,221 @@
+"""Columnar copy of `Stock Dashboard.xlsx`, read through memory maps.
+
+The workbook is parsed once into Arrow IPC files: `ticker.arrow` for the
+ticker sheet, one `history/<TICKER>.arrow` partition per ticker sheet,
+sorted by date, and `sparklines.arrow` with every ticker's Open prices.
+Reads memory-map those files, so a run only touches the columns and date
+range it asks for instead of parsing Excel again.
+
+TickStore.refresh() compares the workbook's size and modification time with
+the ones the store was built from. It only re-ingests when they differ, and
+then only rewrites the partitions whose data changed. It returns the store's
+current TickStoreVersion, which a run reads all its tables and indexes from.
+
+    python tick_store.py  # build or update ./tick_store from the workbook
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import pandas as pd
+import pyarrow as pa
+
+from period_index import PeriodIndex
+
+WORKBOOK_PATH = Path("./Stock Dashboard.xlsx")
+STORE_DIR = Path("./tick_store")
+TICKER_SHEET = "ticker"
+TICKER_NUMERIC_COLUMNS = [
+    "Last Price",
+    "Previous Day Price",
+    "Change",
+    "Change Pct",
+    "Volume",
+    "Volume Avg",
+    "Shares",
+    "Day High",
+    "Day Low",
+    "Market Cap",
+    "P/E Ratio",
+    "EPS",
+]
+HISTORY_NUMERIC_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def workbook_fingerprint(workbook: Path) -> str:
+    stat = workbook.stat()
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def clean_ticker_sheet(ticker_df: pd.DataFrame) -> pd.DataFrame:
+    ticker_df = ticker_df.copy()
+    ticker_df["Last Trade time"] = pd.to_datetime(ticker_df["Last Trade time"], dayfirst=True)
+    ticker_df[TICKER_NUMERIC_COLUMNS] = ticker_df[TICKER_NUMERIC_COLUMNS].apply(
+        pd.to_numeric, errors="coerce"
+    )
+    return ticker_df
+
+
+def clean_history_sheets(sheets: Dict[str, pd.DataFrame], tickers: List[str]) -> pd.DataFrame:
+    """Every ticker's history sheet in one long table with a Ticker column, sorted by ticker then date.
+
+    Stacked first, so each column is converted once for all tickers.
+    """
+    history_df = pd.concat({ticker: sheets[ticker] for ticker in tickers}, names=["Ticker", None])
+    history_df = history_df.reset_index(level="Ticker")
+    history_df["Date"] = pd.to_datetime(history_df["Date"], dayfirst=True)
+    history_df[HISTORY_NUMERIC_COLUMNS] = history_df[HISTORY_NUMERIC_COLUMNS].apply(pd.to_numeric)
+    return history_df.sort_values(["Ticker", "Date"], kind="stable", ignore_index=True)
+
+
+def write_table(table: pa.Table, path: Path):
+    # Written aside then renamed: readers still mapping the old file keep a valid copy
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with pa.OSFile(str(tmp_path), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def ingest(workbook: Path, store_dir: Path) -> dict:
+    """Converts the workbook into the store, rewriting only the partitions that changed.
+    Returns the new manifest.
+    """
+    manifest_path = store_dir / "manifest.json"
+    previous = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+    previous_partitions = previous.get("partitions", {})
+    # Fingerprint taken before parsing, a workbook saved meanwhile gets ingested again next time
+    fingerprint = workbook_fingerprint(workbook)
+
+    sheets = pd.read_excel(workbook, sheet_name=None)
+    ticker_df = clean_ticker_sheet(sheets[TICKER_SHEET])
+    write_table(pa.Table.from_pandas(ticker_df, preserve_index=False), store_dir / "ticker.arrow")
+
+    history_df = clean_history_sheets(sheets, list(ticker_df["Ticker"]))
+    # Row hashes of every ticker at once, each partition's digest then hashes its slice
+    row_hashes = pd.util.hash_pandas_object(history_df.drop(columns="Ticker"), index=False).values
+    by_ticker = history_df.groupby("Ticker", sort=False)
+
+    partitions = {}
+    for ticker, rows in by_ticker.indices.items():
+        digest = hashlib.sha256(row_hashes[rows].tobytes()).hexdigest()
+        path = store_dir / "history" / f"{ticker}.arrow"
+        if previous_partitions.get(ticker) != digest or not path.exists():
+            partition = history_df.iloc[rows].drop(columns="Ticker")
+            write_table(pa.Table.from_pandas(partition, preserve_index=False), path)
+        partitions[ticker] = digest
+    for ticker in set(previous_partitions) - set(partitions):
+        (store_dir / "history" / f"{ticker}.arrow").unlink(missing_ok=True)
+
+    sparklines = by_ticker["Open"].agg(list)
+    write_table(
+        pa.table({"Ticker": sparklines.index.to_numpy(), "Open": sparklines.to_numpy()}),
+        store_dir / "sparklines.arrow",
+    )
+
+    manifest = {"source": fingerprint, "partitions": partitions}
+    manifest_path.write_text(json.dumps(manifest, indent=2))
+    return manifest
+
+
+class TickStoreVersion:
+    """One version of the store: the tables read from it and the indexes built from them.
+
+    TickStore.refresh() swaps in a new one when the workbook changes, so a run
+    holding a version never mixes tables or indexes of two versions: a period
+    index always matches the partition history_rows() slices.
+    """
+
+    def __init__(self, store_dir: Path, version: str):
+        self.store_dir = store_dir
+        self.version = version
+        self._lock = threading.Lock()
+        self._tables: Dict[str, pa.Table] = {}
+        self._period_indexes: Dict[str, PeriodIndex] = {}
+
+    def _table(self, name: str) -> pa.Table:
+        with self._lock:
+            if name not in self._tables:
+                source = pa.memory_map(str(self.store_dir / f"{name}.arrow"))
+                self._tables[name] = pa.ipc.open_file(source).read_all()
+            return self._tables[name]
+
+    def tickers(self) -> pd.DataFrame:
+        return self._table("ticker").to_pandas()
+
+    def sparklines(self) -> Dict[str, List[float]]:
+        """Open prices of every ticker by date, by ticker."""
+        table = self._table("sparklines")
+        return dict(zip(table.column("Ticker").to_pylist(), table.column("Open").to_pylist()))
+
+    def period_index(self, ticker: str) -> PeriodIndex:
+        """Date index and period metrics of `ticker`, built once from the table of this version."""
+        index = self._period_indexes.get(ticker)
+        if index is None:
+            table = self._table(f"history/{ticker}")
+            index = PeriodIndex(
+                table.column("Date").to_numpy(),
+                table.column("Volume").to_numpy(),
+                table.column("Close").to_numpy(),
+            )
+            with self._lock:
+                index = self._period_indexes.setdefault(ticker, index)
+        return index
+
+    def history(
+        self,
+        ticker: str,
+        start: Optional[pd.Timestamp] = None,
+        end: Optional[pd.Timestamp] = None,
+        columns: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
+        """History of `ticker` between `start` and `end` included, only `columns` if given."""
+        lo, hi = self.period_index(ticker).rows(start, end)
+        return self.history_rows(ticker, lo, hi, columns)
+
+    def history_rows(self, ticker: str, lo: int, hi: int, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Rows `lo` to `hi` excluded of `ticker`'s history, as found by its period index."""
+        # Sliced without copying, only the rows and columns asked for are converted
+        table = self._table(f"history/{ticker}").slice(lo, max(0, hi - lo))
+        if columns is not None:
+            table = table.select(columns)
+        return table.to_pandas(split_blocks=True)
+
+
+class TickStore:
+    """Keeps the tick store up to date with the workbook and hands out its current version.
+
+    Shared by every session: a version's memory maps stay open as long as a run holds it.
+    """
+
+    def __init__(self, workbook: Path = WORKBOOK_PATH, store_dir: Path = STORE_DIR):
+        self.workbook = Path(workbook)
+        self.store_dir = Path(store_dir)
+        self._lock = threading.Lock()
+        self._current: Optional[TickStoreVersion] = None
+
+    def refresh(self) -> TickStoreVersion:
+        """Ingests the workbook if it changed since the store was built. Returns the current version."""
+        fingerprint = workbook_fingerprint(self.workbook)
+        with self._lock:
+            if self._current is None or fingerprint != self._current.version:
+                manifest_path = self.store_dir / "manifest.json"
+                manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+                # Stores built before sparklines.arrow existed get it on their next ingest
+                if manifest.get("source") != fingerprint or not (self.store_dir / "sparklines.arrow").exists():
+                    manifest = ingest(self.workbook, self.store_dir)
+                self._current = TickStoreVersion(self.store_dir, manifest["source"])
+            return self._current
+
+
+if __name__ == "__main__":
+    store = TickStore()
+    current = store.refresh()
+    print(f"Tick store {current.version} in {store.store_dir}: {', '.join(current.tickers()['Ticker'])}")
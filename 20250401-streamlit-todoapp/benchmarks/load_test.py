@@ -0,0 +1,264 @@
+"""Rerun latency, write lock waits and throughput of the todo app under concurrent sessions.
+
+Drives ``--sessions`` headless sessions of streamlit_app.py with `AppTest`.
+Every session repeatedly adds a todo, marks one of its page done or deletes
+one, and times the rerun its click triggers. Results are printed (or
+written) as JSON.
+
+    python benchmarks/load_test.py --sessions 50 --workers 8 --actions 20
+    python benchmarks/load_test.py --url postgresql://localhost/todo_bench --output results.json
+
+AppTest keeps a single Streamlit runtime per process and cannot run scripts
+on several threads at once, so concurrency comes from ``--workers``
+processes. Each one stands for a server replica: its sessions share its
+change feed, write queue and connection pool, and take turns clicking. All
+replicas write to the same database, so ``--workers`` is how many reruns
+and write queue flushes compete for it at a time.
+
+Runs against a fresh SQLite database in a temporary directory unless
+``--url`` points at another one. The tables are created and ``--seed-todos``
+todos added before the sessions start.
+
+Every write transaction starts by bumping the todo_version row, so the time
+that UPDATE takes is how long the write waited for the database write lock
+(SQLite) or the row lock (Postgres). Those are the reported lock waits.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+from pathlib import Path
+
+import sqlalchemy as sa
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from streamlit.testing.v1 import AppTest
+
+APP_DIR = Path(__file__).resolve().parent.parent
+APP_SCRIPT = APP_DIR / "streamlit_app.py"
+ACTION_WEIGHTS = {"create": 2, "done": 5, "delete": 1}
+LOCK_STATEMENT_PREFIX = "UPDATE todo_version"
+# Session state key of the app's WriteOutbox
+WRITE_OUTBOX_KEY = "todos_write_outbox"
+
+
+class LockWaitRecorder:
+    """Times the todo_version bump opening every write transaction, on every engine."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.waits_ms = []
+        self.errors = {}
+        event.listen(Engine, "before_cursor_execute", self._before_execute)
+        event.listen(Engine, "after_cursor_execute", self._after_execute)
+        event.listen(Engine, "handle_error", self._on_error)
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith(LOCK_STATEMENT_PREFIX):
+            conn.info["lock_wait_start"] = time.perf_counter()
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        start = conn.info.pop("lock_wait_start", None)
+        if start is not None:
+            with self._lock:
+                self.waits_ms.append((time.perf_counter() - start) * 1000)
+
+    def _on_error(self, context):
+        if context.connection is not None:
+            context.connection.info.pop("lock_wait_start", None)
+        name = type(context.original_exception).__name__
+        with self._lock:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+
+def percentiles(timings: list[float]) -> dict:
+    if not timings:
+        return {"count": 0}
+    timings = sorted(timings)
+
+    def nearest_rank(fraction: float) -> float:
+        return round(timings[min(len(timings) - 1, int(len(timings) * fraction))], 1)
+
+    return {
+        "count": len(timings),
+        "p50_ms": nearest_rank(0.5),
+        "p95_ms": nearest_rank(0.95),
+        "p99_ms": nearest_rank(0.99),
+        "max_ms": round(timings[-1], 1),
+    }
+
+
+def click(at: AppTest, action: str, label: str, rng: random.Random):
+    if action == "create":
+        at.text_input(key="new_todo_form__title").input(label)
+        button = next(button for button in at.button if button.label == "Add todo")
+    else:
+        todo_id = rng.choice(list(at.session_state["todos_data"]))
+        button = at.button(key=f"display_todo_{todo_id}__{action}")
+    button.click().run()
+
+
+def run_worker(sessions: list[int], workdir: str, args: argparse.Namespace) -> dict:
+    """Runs `sessions` in turns within this process and returns their measurements."""
+    # The app reads its connection from the secrets of the working directory.
+    os.chdir(workdir)
+    recorder = LockWaitRecorder()
+    rngs = {session: random.Random(args.seed + session) for session in sessions}
+    apps = {}
+    for session in sessions:
+        apps[session] = AppTest.from_file(str(APP_SCRIPT), default_timeout=args.timeout)
+        if args.pool_size is not None:
+            apps[session].session_state["pool_settings__pool_size"] = args.pool_size
+        apps[session].run()
+
+    timings = {action: [] for action in ACTION_WEIGHTS}
+    exceptions = []
+    for step in range(args.actions):
+        for session, at in list(apps.items()):
+            rng = rngs[session]
+            action = rng.choices(list(ACTION_WEIGHTS), weights=list(ACTION_WEIGHTS.values()))[0]
+            if not at.session_state["todos_data"]:
+                action = "create"
+            start = time.perf_counter()
+            click(at, action, f"Session {session} todo {step}", rng)
+            timings[action].append((time.perf_counter() - start) * 1000)
+            if at.exception:
+                exceptions.append(at.exception[0].message)
+                del apps[session]
+            time.sleep(args.think)
+
+    # Done and delete clicks only queue their write, wait for the queue to flush them
+    outboxes = [at.session_state[WRITE_OUTBOX_KEY] for at in apps.values() if WRITE_OUTBOX_KEY in at.session_state]
+    deadline = time.monotonic() + args.timeout
+    while any(outbox.pending for outbox in outboxes) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    failures = [message for outbox in outboxes for message in outbox.collect()]
+
+    return {
+        "timings": timings,
+        "lock_waits_ms": recorder.waits_ms,
+        "database_errors": recorder.errors,
+        "conflicts": sum("another session" in message for message in failures),
+        "failed_writes": sum("another session" not in message for message in failures),
+        "exceptions": exceptions,
+    }
+
+
+def prepare_database(workdir: Path, url: str, seed_todos: int, timeout: float) -> sa.Engine:
+    (workdir / ".streamlit").mkdir(parents=True, exist_ok=True)
+    (workdir / ".streamlit" / "secrets.toml").write_text(f'[connections.todo_db]\ntype = "sql"\nurl = "{url}"\n')
+    os.chdir(workdir)
+
+    main_module = sys.modules["__main__"]
+    at = AppTest.from_file(str(APP_SCRIPT), default_timeout=timeout).run()
+    next(button for button in at.sidebar.button if button.label == "Create table").click().run()
+    # Running the script registered it as __main__, spawned workers would import it instead of this file
+    sys.modules["__main__"] = main_module
+
+    engine = sa.create_engine(url)
+    if seed_todos:
+        with engine.begin() as connection:
+            connection.execute(
+                sa.text("INSERT INTO todo (title, created_at, due_at, done) VALUES (:title, :today, :today, :done)"),
+                [{"title": f"Seed todo {i}", "today": date.today(), "done": i % 3 == 0} for i in range(seed_todos)],
+            )
+    return engine
+
+
+def table_version(engine: sa.Engine) -> int:
+    with engine.connect() as connection:
+        return connection.execute(sa.text("SELECT version FROM todo_version")).scalar_one()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processes the sessions are spread over")
+    parser.add_argument("--actions", type=int, default=20, help="clicks per session")
+    parser.add_argument("--think", type=float, default=0.0, help="seconds a worker waits between clicks")
+    parser.add_argument("--seed-todos", type=int, default=200)
+    parser.add_argument("--url", help="database URL, a fresh SQLite file by default")
+    parser.add_argument("--pool-size", type=int, help="pool_size setting of every session")
+    parser.add_argument("--timeout", type=float, default=120, help="seconds a single script run may take")
+    parser.add_argument("--seed", type=int, default=0, help="random seed of the click sequences")
+    parser.add_argument("--output", type=Path, help="write the JSON here instead of stdout")
+    args = parser.parse_args()
+    # Resolved before changing into the working directory below.
+    output_path = args.output.resolve() if args.output else None
+    workers = max(1, min(args.workers, args.sessions))
+
+    workdir = Path(tempfile.mkdtemp(prefix="todo-load-test-"))
+    url = args.url or f"sqlite:///{workdir / 'todo.db'}"
+    engine = prepare_database(workdir, url, args.seed_todos, args.timeout)
+    start_version = table_version(engine)
+
+    # Spawned rather than forked, so no worker inherits the parent's pooled connections
+    context = multiprocessing.get_context("spawn")
+    start = time.perf_counter()
+    with context.Pool(workers) as pool:
+        worker_results = pool.starmap(
+            run_worker,
+            [(list(range(args.sessions))[worker::workers], str(workdir), args) for worker in range(workers)],
+        )
+    elapsed = time.perf_counter() - start
+    write_transactions = table_version(engine) - start_version
+
+    by_action = {action: [] for action in ACTION_WEIGHTS}
+    database_errors = {}
+    for result in worker_results:
+        for action, timings in result["timings"].items():
+            by_action[action].extend(timings)
+        for name, count in result["database_errors"].items():
+            database_errors[name] = database_errors.get(name, 0) + count
+    clicks = sum(len(timings) for timings in by_action.values())
+
+    results = {
+        "config": {
+            "sessions": args.sessions,
+            "workers": workers,
+            "actions": args.actions,
+            "think_s": args.think,
+            "seed_todos": args.seed_todos,
+            "dialect": engine.dialect.name,
+            "pool_size": args.pool_size or "app default",
+        },
+        "rerun": {
+            "all": percentiles([timing for timings in by_action.values() for timing in timings]),
+            **{action: percentiles(timings) for action, timings in by_action.items()},
+        },
+        "throughput": {
+            "clicks_per_s": round(clicks / elapsed, 1),
+            "write_transactions_per_s": round(write_transactions / elapsed, 1),
+            "elapsed_s": round(elapsed, 2),
+        },
+        "lock_wait": {
+            **percentiles([wait for result in worker_results for wait in result["lock_waits_ms"]]),
+            "database_errors": database_errors,
+        },
+        "write_failures": {
+            "conflicts": sum(result["conflicts"] for result in worker_results),
+            "errors": sum(result["failed_writes"] for result in worker_results),
+        },
+        "exceptions": [message for result in worker_results for message in result["exceptions"]] or None,
+    }
+    engine.dispose()
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    output = json.dumps(results, indent=2)
+    if output_path:
+        output_path.write_text(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Memory a session spends holding todos: dict-backed dataclass against the slotted Todo.
+
+Fills an in-memory SQLite table with ``--todos`` rows, then loads them into a
+``{id: todo}`` dict the way session state holds them, once per representation:
+
+- ``dataclass``: the former Todo, a regular dataclass built from ``row._mapping``
+- ``slotted``: todo_model.Todo, frozen with ``__slots__`` and built by unpacking the row
+
+Both are measured for the whole table and for one page of ``--page-size``
+todos, which is all a session keeps since the app paginates. Retained and
+peak memory come from ``tracemalloc`` and include the fetched values (strings,
+dates), as each session loads its own. Results are printed as JSON.
+
+    python benchmarks/todo_memory.py --todos 100000
+"""
+
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import date
+from datetime import timedelta
+from pathlib import Path
+from typing import Optional
+
+import sqlalchemy as sa
+
+APP_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(APP_DIR))
+from todo_model import Todo  # noqa: E402
+
+
+@dataclass
+class DictTodo:
+    id: Optional[int] = None
+    title: str = ""
+    description: Optional[str] = None
+    created_at: Optional[date] = None
+    due_at: Optional[date] = None
+    done: bool = False
+    version: int = 0
+
+    @classmethod
+    def from_row(cls, row):
+        if row:
+            return cls(**row._mapping)
+        return None
+
+
+REPRESENTATIONS = {"dataclass": DictTodo, "slotted": Todo}
+
+# Same columns, in the same order, as the app's todo table
+metadata = sa.MetaData()
+todo_table = sa.Table(
+    "todo",
+    metadata,
+    sa.Column("id", sa.Integer, primary_key=True),
+    sa.Column("title", sa.String(30)),
+    sa.Column("description", sa.String, nullable=True),
+    sa.Column("created_at", sa.Date),
+    sa.Column("due_at", sa.Date, nullable=True),
+    sa.Column("done", sa.Boolean, nullable=True),
+    sa.Column("version", sa.Integer, nullable=False, server_default="0"),
+)
+
+
+def fill_database(engine: sa.Engine, count: int):
+    metadata.create_all(engine)
+    today = date.today()
+    with engine.begin() as connection:
+        connection.execute(
+            todo_table.insert(),
+            [
+                {
+                    "title": f"Todo number {i}",
+                    "description": f"Details of todo {i}" if i % 2 else None,
+                    "created_at": today,
+                    "due_at": today + timedelta(days=i % 30),
+                    "done": i % 3 == 0,
+                }
+                for i in range(count)
+            ],
+        )
+
+
+def measure(engine: sa.Engine, todo_class, limit: int) -> dict:
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    with engine.connect() as connection:
+        rows = connection.execute(sa.select(todo_table).order_by(todo_table.c.id).limit(limit)).all()
+    todos = {todo.id: todo for todo in map(todo_class.from_row, rows)}
+    del rows
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "todos": len(todos),
+        "load_ms": round(elapsed_ms, 1),
+        "retained_kb": round(retained / 1024, 1),
+        "peak_kb": round(peak / 1024, 1),
+        "bytes_per_todo": round(retained / max(1, len(todos))),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--todos", type=int, default=100_000)
+    parser.add_argument("--page-size", type=int, default=10, help="todos per page, TODOS_PER_PAGE of the app")
+    args = parser.parse_args()
+
+    # One connection for the whole run, an in-memory database lives as long as it does
+    engine = sa.create_engine("sqlite://", poolclass=sa.pool.StaticPool)
+    fill_database(engine, args.todos)
+
+    results = {"config": {"todos": args.todos, "page_size": args.page_size}}
+    for scope, limit in (("table", args.todos), ("page", args.page_size)):
+        # Once unmeasured, so both representations run with warm statement caches
+        measure(engine, DictTodo, limit)
+        results[scope] = {name: measure(engine, todo_class, limit) for name, todo_class in REPRESENTATIONS.items()}
+        results[scope]["retained_ratio"] = round(
+            results[scope]["dataclass"]["retained_kb"] / results[scope]["slotted"]["retained_kb"], 2
+        )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
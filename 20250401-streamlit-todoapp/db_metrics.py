@@ -0,0 +1,160 @@
+"""Connection pool and query metrics for a SQLAlchemy engine.
+
+MeteredConnection wraps the engine of a `st.connection` SQL connection and
+offers the same `connection.session` usage, while timing how long each session
+waits for a pooled connection and how long each statement runs.
+"""
+
+import logging
+import threading
+import time
+import weakref
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict
+from typing import List
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, float("inf"))
+SLOW_QUERY_MS = 100
+SLOW_QUERY_LOG_SIZE = 20
+
+_metrics_by_engine = weakref.WeakKeyDictionary()
+_metrics_lock = threading.Lock()
+
+
+class LatencyHistogram:
+    def __init__(self, buckets_ms=LATENCY_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self.counts = [0] * len(buckets_ms)
+        self.total = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, duration_ms: float):
+        for i, upper_ms in enumerate(self.buckets_ms):
+            if duration_ms <= upper_ms:
+                self.counts[i] += 1
+                break
+        self.total += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given fraction of samples."""
+        if not self.total:
+            return None
+        threshold = fraction * self.total
+        seen = 0
+        for upper_ms, count in zip(self.buckets_ms, self.counts):
+            seen += count
+            if seen >= threshold:
+                return min(upper_ms, self.max_ms)
+        return self.max_ms
+
+    def as_dict(self) -> Dict[str, int]:
+        labels = [f"≤{upper_ms:g} ms" for upper_ms in self.buckets_ms[:-1]]
+        labels.append(f">{self.buckets_ms[-2]:g} ms")
+        return dict(zip(labels, self.counts))
+
+
+@dataclass(frozen=True)
+class SlowQuery:
+    duration_ms: float
+    statement: str
+    finished_at: float
+
+
+class PoolMetrics:
+    """Collects checkout waits and statement latencies of one engine.
+
+    Statement timings come from engine events, so every statement is measured,
+    including those run outside MeteredConnection.session.
+    """
+
+    def __init__(self, engine: Engine, slow_query_ms: float = SLOW_QUERY_MS):
+        # Only the pool is kept, holding the engine would keep it and its
+        # metrics alive after st.connection replaced it once its ttl expired.
+        self.pool = engine.pool
+        self.slow_query_ms = slow_query_ms
+        self._lock = threading.Lock()
+        self.checkout_wait = LatencyHistogram()
+        self.query_latency = LatencyHistogram()
+        self.slow_queries = deque(maxlen=SLOW_QUERY_LOG_SIZE)
+
+        event.listen(engine, "before_cursor_execute", self._before_execute)
+        event.listen(engine, "after_cursor_execute", self._after_execute)
+        event.listen(engine, "handle_error", self._on_error)
+
+    @classmethod
+    def for_engine(cls, engine: Engine) -> "PoolMetrics":
+        """Metrics of `engine`, instrumenting it on first use."""
+        with _metrics_lock:
+            if engine not in _metrics_by_engine:
+                _metrics_by_engine[engine] = cls(engine)
+            return _metrics_by_engine[engine]
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        duration_ms = (time.perf_counter() - conn.info["query_start"].pop()) * 1000
+        with self._lock:
+            self.query_latency.record(duration_ms)
+            if duration_ms >= self.slow_query_ms:
+                self.slow_queries.append(SlowQuery(duration_ms, statement, time.time()))
+        if duration_ms >= self.slow_query_ms:
+            logger.warning("Slow query (%.0f ms): %s", duration_ms, statement)
+
+    def _on_error(self, context):
+        if context.connection is not None and context.connection.info.get("query_start"):
+            context.connection.info["query_start"].pop()
+
+    def record_checkout(self, wait_ms: float):
+        with self._lock:
+            self.checkout_wait.record(wait_ms)
+
+    def pool_status(self) -> Dict[str, int]:
+        pool = self.pool
+        # Only QueuePool sizes itself, other pool classes report zeros
+        if not hasattr(pool, "overflow"):
+            return {"size": 0, "checked_out": 0, "idle": 0, "overflow": 0}
+        return {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            # Counts up from -size as connections open, only the part above size overflows
+            "overflow": max(0, pool.overflow()),
+        }
+
+    def recent_slow_queries(self) -> List[SlowQuery]:
+        with self._lock:
+            return list(reversed(self.slow_queries))
+
+
+class MeteredConnection:
+    """Stands in for a SQLConnection: `with connection.session as session` works the same."""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.metrics = PoolMetrics.for_engine(engine)
+
+    @property
+    def session(self):
+        return self._session()
+
+    @contextmanager
+    def _session(self):
+        start = time.perf_counter()
+        with self.engine.connect() as connection:
+            self.metrics.record_checkout((time.perf_counter() - start) * 1000)
+            with Session(bind=connection) as session:
+                yield session
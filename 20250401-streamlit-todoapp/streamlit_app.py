@@ -1,18 +1,38 @@
+import csv
+import io
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from collections import deque
 from dataclasses import dataclass
+from dataclasses import replace
 from datetime import date
 from typing import Dict
+from typing import Iterable
+from typing import List
 from typing import Optional
+from typing import Tuple
 
 import sqlalchemy as sa
 import streamlit as st
 from sqlalchemy import Boolean
 from sqlalchemy import Column
 from sqlalchemy import Date
+from sqlalchemy import Index
 from sqlalchemy import Integer
 from sqlalchemy import MetaData
 from sqlalchemy import String
 from sqlalchemy import Table
-from streamlit.connections import SQLConnection
+from sqlalchemy.sql.expression import UnaryExpression
+from sqlalchemy.sql.operators import custom_op
+
+from db_metrics import MeteredConnection
+from db_metrics import PoolMetrics
+from todo_model import Todo
+
+logger = logging.getLogger(__name__)
 
 st.set_page_config(
     page_title="Streamlit Todo App",
@@ -25,24 +45,258 @@ st.set_page_config(
 ##################################################
 
 TABLE_NAME = "todo"
+VERSION_TABLE_NAME = "todo_version"
+SEARCH_TABLE_NAME = "todo_fts"
+SCHEMA_TABLE_NAME = "schema_version"
 SESSION_STATE_KEY_TODOS = "todos_data"
-
-
-@dataclass
-class Todo:
-    id: Optional[int] = None
-    title: str = ""
-    description: Optional[str] = None
-    created_at: Optional[date] = None
-    due_at: Optional[date] = None
-    done: bool = False
-
-    # Class method to easily create a Todo object from a database row
-    @classmethod
-    def from_row(cls, row):
-        if row:
-            return cls(**row._mapping)
-        return None
+SESSION_STATE_KEY_TODOS_VERSION = "todos_version"
+SESSION_STATE_KEY_TODOS_HAS_NEXT = "todos_has_next"
+SESSION_STATE_KEY_TODOS_CURSORS = "todos_page_cursors"
+SESSION_STATE_KEY_SELECTED_TODOS = "todos_selected"
+SESSION_STATE_KEY_WRITE_OUTBOX = "todos_write_outbox"
+SESSION_STATE_KEY_TODOS_STALE = "todos_stale"
+TODOS_PER_PAGE = 10
+# Filter values for the done column, None lets every todo through
+TODO_FILTERS = {"All": None, "Open": False, "Done": True}
+# Columns each sort orders by, ending with id so every todo has a unique position.
+# Todos without a due date come first, in SQL and in todo_sort_order alike.
+TODO_SORTS = {"Created": ("id",), "Due date": ("due_at", "id")}
+CHANGE_FEED_SIZE = 1000
+# A write touching more todos is published without them, every session reloads its page
+CHANGE_FEED_MAX_TODOS = 100
+CHANGE_FEED_POLL_SECONDS = 2
+# The write queue waits this long after a write for more to join its batch
+WRITE_BATCH_SECONDS = 0.05
+WRITE_BATCH_SIZE = 100
+WRITE_QUEUE_HISTORY_SIZE = 10_000
+# create_engine pool arguments, editable from the admin sidebar
+DEFAULT_POOL_SETTINGS = {"pool_size": 5, "max_overflow": 10, "pool_pre_ping": False}
+
+
+@dataclass(frozen=True)
+class TodoChange:
+    version: int
+    # Every todo the write touched by id, None for deleted ones.
+    # Empty when the write matched no row, None when it touched
+    # more than CHANGE_FEED_MAX_TODOS, the change then reloads every page.
+    todos: Optional[Dict[int, Optional[Todo]]]
+
+
+class ChangeFeed:
+    """In-memory log of the latest writes to the todo table, shared by all sessions.
+
+    Changes are numbered by the table version their write produced, so a session
+    holding version N catches up by applying the changes numbered N+1, N+2...
+
+    Writes of other server processes never reach the feed. They show in the
+    table version stored in the database, read at most once every `check_seconds`
+    for all sessions of this process.
+    """
+
+    def __init__(
+        self, max_changes: int = CHANGE_FEED_SIZE, check_seconds: float = CHANGE_FEED_POLL_SECONDS
+    ):
+        self._lock = threading.Lock()
+        self._changes = deque(maxlen=max_changes)
+        self._check_seconds = check_seconds
+        self._checked_at = float("-inf")
+        # Highest table version read from the database so far
+        self._database_version = 0
+
+    def publish(self, change: TodoChange):
+        with self._lock:
+            self._changes.append(change)
+
+    def since(self, version: int, read_version) -> Optional[List[TodoChange]]:
+        """Changes after `version` in order, or None when some are missing from the feed:
+        already trimmed, not published yet, or written by another server process.
+
+        `read_version()` returns the table version stored in the database, when
+        the last check is older than `check_seconds`. Until then, writes of
+        other processes are only noticed when a later change of this one shows a gap.
+        """
+        now = time.monotonic()
+        with self._lock:
+            # One session checks for all of them, the others use its result
+            check = now - self._checked_at >= self._check_seconds
+            if check:
+                self._checked_at = now
+        if check:
+            database_version = read_version()
+            with self._lock:
+                self._database_version = max(self._database_version, database_version)
+
+        with self._lock:
+            # Concurrent writers may publish out of version order
+            changes = sorted(
+                (change for change in self._changes if change.version > version),
+                key=lambda change: change.version,
+            )
+            database_version = self._database_version
+        for expected_version, change in enumerate(changes, start=version + 1):
+            if change.version != expected_version:
+                return None
+        if database_version > (changes[-1].version if changes else version):
+            return None
+        return changes
+
+
+@dataclass(frozen=True, eq=False)
+class PendingWrite:
+    todo_id: int
+    title: str
+    # Column values to set, None deletes the todo
+    values: Optional[dict]
+    # Version of the todo the session edited, the write is refused once the row moved past it
+    base_version: int
+    outbox: "WriteOutbox"
+
+
+class WriteOutbox:
+    """What the write queue owes one session: how many of its writes are still
+    queued, and the messages of those that failed, until the session collects them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._failures: List[str] = []
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return self._pending
+
+    @property
+    def has_failures(self) -> bool:
+        with self._lock:
+            return bool(self._failures)
+
+    def sent(self):
+        with self._lock:
+            self._pending += 1
+
+    def done(self, failure: Optional[str] = None):
+        with self._lock:
+            self._pending -= 1
+            if failure is not None:
+                self._failures.append(failure)
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            failures, self._failures = self._failures, []
+        return failures
+
+
+def write_failure_message(write: PendingWrite, error: Exception) -> str:
+    # The DBAPI error reads better than SQLAlchemy's, which adds the statement
+    reason = getattr(error, "orig", None) or error
+    return f"Could not save “{write.title}”, your edit was undone: {reason}"
+
+
+class WriteQueue:
+    """Write-behind queue for edits of single todos, shared by all sessions.
+
+    Callbacks put their edit here and return, a background thread writes
+    everything queued meanwhile in one transaction. Each write only applies
+    if the todo still has the version its session saw and the database
+    accepts it, otherwise its session finds the failure in its outbox on its
+    next run. The other writes of the batch apply all the same.
+    """
+
+    def __init__(self, flush, batch_seconds: float = WRITE_BATCH_SECONDS):
+        # flush(connection, writes) writes a batch and returns the table version
+        # it committed as, the writes that applied and the errors of those the
+        # database refused, by write
+        self._flush = flush
+        self._batch_seconds = batch_seconds
+        self._condition = threading.Condition()
+        self._pending: List[PendingWrite] = []
+        self._connection = None
+        self._thread = None
+        # Table version written for each (outbox, todo id, version the session saw).
+        # A session edits a todo again before it catches up with its own write,
+        # the new write is then checked against that version instead.
+        self._written_versions = OrderedDict()
+
+    def put(self, connection: MeteredConnection, write: PendingWrite):
+        with self._condition:
+            self._connection = connection
+            for i, queued in enumerate(self._pending):
+                if (queued.outbox, queued.todo_id) == (write.outbox, write.todo_id):
+                    # Not flushed yet, fold both edits into one write
+                    values = None
+                    if queued.values is not None and write.values is not None:
+                        values = {**queued.values, **write.values}
+                    self._pending[i] = replace(queued, values=values)
+                    return
+            write.outbox.sent()
+            self._pending.append(write)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="todo-write-queue", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending)
+            # Let the writes arriving meanwhile join the batch
+            time.sleep(self._batch_seconds)
+            with self._condition:
+                batch = self._pending[:WRITE_BATCH_SIZE]
+                del self._pending[:WRITE_BATCH_SIZE]
+                connection = self._connection
+            self._write_batch(connection, batch)
+
+    def _write_batch(self, connection: MeteredConnection, batch: List[PendingWrite]):
+        keys = [(write.outbox, write.todo_id, write.base_version) for write in batch]
+        rebased = [
+            replace(write, base_version=self._written_versions.get(key, write.base_version))
+            for key, write in zip(keys, batch)
+        ]
+        try:
+            version, applied, errors = self._flush(connection, rebased)
+        except Exception as e:
+            logger.exception("Todo write batch failed")
+            for write in batch:
+                write.outbox.done(write_failure_message(write, e))
+            return
+
+        for key, write in zip(keys, rebased):
+            if write in errors:
+                write.outbox.done(write_failure_message(write, errors[write]))
+            elif write in applied:
+                self._written_versions[key] = version
+                write.outbox.done()
+            else:
+                write.outbox.done(
+                    f"“{write.title}” was changed or deleted in another session, your edit was undone"
+                )
+        while len(self._written_versions) > WRITE_QUEUE_HISTORY_SIZE:
+            self._written_versions.popitem(last=False)
+
+
+class SchemaState:
+    """Schema version of the database, read once per process.
+
+    Saves every run from inspecting the database catalog. Whoever changes
+    the schema calls invalidate() so the next run reads it again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+
+    def version(self, read_version) -> int:
+        with self._lock:
+            if self._version is None:
+                self._version = read_version()
+            return self._version
+
+    def invalidate(self):
+        with self._lock:
+            self._version = None
 
 
 # Use st.cache_resource to define the database table structure only once
@@ -54,12 +308,43 @@ def connect_table():
     todo_table = Table(
         TABLE_NAME,
         metadata_obj,
+        # In the order of the Todo fields, Todo.from_row unpacks rows by position
         Column("id", Integer, primary_key=True),
         Column("title", String(30)),
         Column("description", String, nullable=True),
         Column("created_at", Date),
         Column("due_at", Date, nullable=True),
         Column("done", Boolean, nullable=True),
+        # Table version of the last write to this row
+        Column("version", Integer, nullable=False, server_default="0"),
+        # SQLite appends the rowid, which is id, to every index entry, so these
+        # also serve the (..., id) keyset pagination order of each filter and sort
+        Index("ix_todo_due_at", "due_at"),
+        Index("ix_todo_done", "done"),
+        Index("ix_todo_done_due_at", "done", "due_at"),
+    )
+    # Single row counter bumped by every write to the todo table.
+    # A session knows it missed nobody else's write when the version
+    # its own write returns is exactly one more than the one it last saw.
+    Table(
+        VERSION_TABLE_NAME,
+        metadata_obj,
+        Column("id", Integer, primary_key=True),
+        Column("version", Integer, nullable=False),
+    )
+    # Single row holding how many of MIGRATIONS the database went through
+    Table(
+        SCHEMA_TABLE_NAME,
+        metadata_obj,
+        Column("id", Integer, primary_key=True),
+        Column("version", Integer, nullable=False),
+    )
+    metadata_obj.info["schema_state"] = SchemaState()
+    # The change feed lives on the shared table handle,
+    # so every function given the table can publish to it or read from it.
+    todo_table.info["change_feed"] = ChangeFeed()
+    todo_table.info["write_queue"] = WriteQueue(
+        lambda connection, writes: flush_todo_writes(connection, todo_table, writes)
     )
     return metadata_obj, todo_table
 
@@ -69,27 +354,536 @@ def connect_table():
 ##################################################
 
 
-def check_table_exists(connection: SQLConnection, table_name: str) -> bool:
-    inspector = sa.inspect(connection.engine)
-    return inspector.has_table(table_name)
+# SQLite FTS5 index over title and description. It stores no copy of the text
+# (external content), the triggers keep it in step with every write to the todo table.
+SEARCH_INDEX_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE_NAME} USING fts5(
+        title, description, content='{TABLE_NAME}', content_rowid='id'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE_NAME}_insert AFTER INSERT ON {TABLE_NAME} BEGIN
+        INSERT INTO {SEARCH_TABLE_NAME}(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE_NAME}_delete AFTER DELETE ON {TABLE_NAME} BEGIN
+        INSERT INTO {SEARCH_TABLE_NAME}({SEARCH_TABLE_NAME}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE_NAME}_update
+    AFTER UPDATE OF title, description ON {TABLE_NAME} BEGIN
+        INSERT INTO {SEARCH_TABLE_NAME}({SEARCH_TABLE_NAME}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {SEARCH_TABLE_NAME}(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END""",
+    # Indexes the todos written before the search index existed
+    f"INSERT INTO {SEARCH_TABLE_NAME}({SEARCH_TABLE_NAME}) VALUES ('rebuild')",
+]
+
+
+def has_search_index(connection: MeteredConnection) -> bool:
+    return connection.engine.dialect.name == "sqlite"
+
+
+# Schema migrations, applied in order by migrate_schema.
+# Each one checks what is already there, as databases created before the
+# schema_version table existed went through some of them without being counted.
+# Append new migrations, never edit or reorder the ones already released.
+
+
+def create_todo_table(connection: sa.Connection, metadata: MetaData):
+    metadata.tables[TABLE_NAME].create(connection, checkfirst=True)
+
+
+def add_version_tracking(connection: sa.Connection, metadata: MetaData):
+    todo_columns = {column["name"] for column in sa.inspect(connection).get_columns(TABLE_NAME)}
+    if "version" not in todo_columns:
+        connection.execute(
+            sa.text(f"ALTER TABLE {TABLE_NAME} ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        )
+    version_table = metadata.tables[VERSION_TABLE_NAME]
+    version_table.create(connection, checkfirst=True)
+    if connection.execute(sa.select(version_table)).first() is None:
+        connection.execute(version_table.insert().values(id=1, version=0))
+
+
+def add_filter_indexes(connection: sa.Connection, metadata: MetaData):
+    for index in metadata.tables[TABLE_NAME].indexes:
+        index.create(connection, checkfirst=True)
+
+
+def add_search_index(connection: sa.Connection, metadata: MetaData):
+    if connection.dialect.name == "sqlite":
+        for statement in SEARCH_INDEX_DDL:
+            connection.execute(sa.text(statement))
+
 
+MIGRATIONS = [
+    ("Create the todo table", create_todo_table),
+    ("Track todo versions", add_version_tracking),
+    ("Index the done and due date columns", add_filter_indexes),
+    ("Add the full-text search index", add_search_index),
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def read_schema_version(connection: MeteredConnection, metadata: MetaData) -> int:
+    """How many migrations the database went through, 0 for an empty database."""
+    if not sa.inspect(connection.engine).has_table(SCHEMA_TABLE_NAME):
+        return 0
+    schema_table = metadata.tables[SCHEMA_TABLE_NAME]
+    with connection.session as session:
+        return session.execute(sa.select(schema_table.c.version)).scalar_one_or_none() or 0
+
+
+def get_schema_version(connection: MeteredConnection, metadata: MetaData) -> int:
+    return metadata.info["schema_state"].version(
+        lambda: read_schema_version(connection, metadata)
+    )
+
+
+def migrate_schema(connection: MeteredConnection, metadata: MetaData) -> List[str]:
+    """Creates the tables or brings them up to SCHEMA_VERSION.
+    Returns the descriptions of the migrations it applied.
+
+    Each migration commits together with its schema version bump.
+    """
+    schema_table = metadata.tables[SCHEMA_TABLE_NAME]
+    schema_table.create(connection.engine, checkfirst=True)
+    applied = []
+    try:
+        for version, (description, migrate) in enumerate(MIGRATIONS, start=1):
+            with connection.session as session:
+                current_version = session.execute(
+                    sa.select(schema_table.c.version)
+                ).scalar_one_or_none()
+                if current_version is None:
+                    session.execute(schema_table.insert().values(id=1, version=0))
+                    current_version = 0
+                if current_version >= version:
+                    continue
+                migrate(session.connection(), metadata)
+                session.execute(schema_table.update().values(version=version))
+                session.commit()
+            applied.append(description)
+    finally:
+        metadata.info["schema_state"].invalidate()
+    return applied
+
+
+def search_condition(connection: MeteredConnection, table: Table, query: str):
+    """WHERE clause matching todos whose title or description contain every word
+    of `query`, with the last letters of each word free so results show while typing.
+    """
+    words = re.findall(r"\w+", query)
+    if not has_search_index(connection):
+        # No FTS5 outside SQLite, fall back to a scan
+        return sa.and_(
+            *(
+                sa.or_(table.c.title.ilike(f"%{word}%"), table.c.description.ilike(f"%{word}%"))
+                for word in words
+            )
+        )
+
+    # Quoted so words are never read as FTS5 operators
+    match = " ".join(f'"{word}"*' for word in words)
+    matching_ids = (
+        sa.select(sa.column("rowid"))
+        .select_from(sa.table(SEARCH_TABLE_NAME))
+        .where(sa.text(f"{SEARCH_TABLE_NAME} MATCH :match").bindparams(match=match))
+    )
+    return table.c.id.in_(matching_ids)
+
+
+def unindexed(column):
+    """`+column` in SQLite: the same value, but the query planner can no longer use an index for it."""
+    return UnaryExpression(column, operator=custom_op("+"), type_=column.type)
+
+
+def todo_sort_key(todo_item: Todo, sort: str) -> tuple:
+    return tuple(getattr(todo_item, column) for column in TODO_SORTS[sort])
+
+
+def todo_sort_order(sort_key: tuple) -> tuple:
+    """`sort_key` made comparable in Python, with NULLs first as load_todo_window orders them."""
+    return tuple((value is not None, value) for value in sort_key)
+
+
+def keyset_after(sort_columns: list, cursor: tuple):
+    """Condition on the rows sorting after `cursor`, NULLs first.
+
+    A row value comparison when the cursor holds no NULL, which the database
+    seeks in its index, and skips the NULL rows sorting before the cursor.
+    Compared to a NULL it is never true though, so a NULL in the cursor is
+    compared column by column instead.
+    """
+    if None not in cursor:
+        return sa.tuple_(*sort_columns) > tuple(cursor)
+    conditions = []
+    for i, (column, value) in enumerate(zip(sort_columns, cursor)):
+        same_before = [
+            before.is_(None) if before_value is None else before == before_value
+            for before, before_value in zip(sort_columns[:i], cursor[:i])
+        ]
+        after = column.is_not(None) if value is None else column > value
+        conditions.append(sa.and_(*same_before, after))
+    return sa.or_(*conditions)
+
+
+def load_todo_window(
+    connection: MeteredConnection,
+    table: Table,
+    done_filter: Optional[bool],
+    sort: str,
+    cursor: Optional[tuple],
+    search: str = "",
+    limit: int = TODOS_PER_PAGE,
+) -> Tuple[Dict[int, Todo], bool, int]:
+    """Fetches one page of todos as a dict keyed by id, in display order.
+    Also returns whether more todos follow and the table version the page matches.
+
+    Keyset pagination: the page starts right after `cursor`, the sort key of the
+    previous page's last todo, so the database seeks to it instead of counting
+    past every earlier row like OFFSET would.
+    """
+    version_table = table.metadata.tables[VERSION_TABLE_NAME]
+    sort_columns = [table.c[column] for column in TODO_SORTS[sort]]
+    done_column = table.c.done
+    searching = re.search(r"\w", search) is not None
+    if searching and has_search_index(connection):
+        # Start from the todos the search index matches. Walking the due_at or done
+        # index instead, as SQLite would, visits every todo when only a few match.
+        sort_columns = [unindexed(column) for column in sort_columns]
+        done_column = unindexed(done_column)
+
+    # NULLS FIRST is SQLite's default, spelled out for databases sorting them last
+    stmt = (
+        sa.select(table)
+        .order_by(*(column.asc().nulls_first() for column in sort_columns))
+        .limit(limit + 1)
+    )
+    if done_filter is not None:
+        stmt = stmt.where(done_column == done_filter)
+    if cursor is not None:
+        stmt = stmt.where(keyset_after(sort_columns, tuple(cursor)))
+    if searching:
+        stmt = stmt.where(search_condition(connection, table, search))
 
-def load_all_todos(connection: SQLConnection, table: Table) -> Dict[int, Todo]:
-    """Fetches all todos from the DB and returns as a dict keyed by id."""
-    stmt = sa.select(table).order_by(table.c.id)
     with connection.session as session:
+        # Both reads run in one transaction, so the version matches the rows
         result = session.execute(stmt)
         todos = [Todo.from_row(row) for row in result.all()]
-        return {todo.id: todo for todo in todos if todo}
+        version = session.execute(sa.select(version_table.c.version)).scalar_one()
+        return {todo.id: todo for todo in todos[:limit]}, len(todos) > limit, version
 
 
-def load_todo(connection: SQLConnection, table: Table, todo_id: int) -> Optional[Todo]:
-    """Fetches a single todo by id from the DB."""
-    stmt = sa.select(table).where(table.c.id == todo_id)
+def read_todo_version(connection: MeteredConnection, table: Table) -> int:
+    version_table = table.metadata.tables[VERSION_TABLE_NAME]
     with connection.session as session:
-        result = session.execute(stmt)
-        row = result.first()
-        return Todo.from_row(row)
+        return session.execute(sa.select(version_table.c.version)).scalar_one()
+
+
+def write_todos(
+    connection: MeteredConnection,
+    table: Table,
+    stmt,
+    rows: Optional[List[dict]] = None,
+) -> Tuple[int, int]:
+    """Runs an insert, update or delete of any number of todos as one transaction
+    and returns the new table version with how many todos it wrote.
+    Pass `rows` to execute an insert once per row dict, as a single executemany.
+
+    The version bump and the write share the transaction. The change is then
+    published for every session to apply: RETURNING hands back the rows as
+    stored for the feed, unless the write touches more than CHANGE_FEED_MAX_TODOS.
+    Those are only counted and published as a reload, applying them one by one
+    would cost every session more than reloading its page.
+    """
+    version_table = table.metadata.tables[VERSION_TABLE_NAME]
+    deleted = isinstance(stmt, sa.Delete)
+    with connection.session as session:
+        # Every write bumps the version first, so the count below holds until the commit
+        version = session.execute(
+            version_table.update()
+            .values(version=version_table.c.version + 1)
+            .returning(version_table.c.version)
+        ).scalar_one()
+        if rows is not None:
+            count = len(rows)
+        elif isinstance(stmt, sa.Insert):
+            count = 1
+        else:
+            count_stmt = sa.select(sa.func.count()).select_from(table)
+            if stmt.whereclause is not None:
+                count_stmt = count_stmt.where(stmt.whereclause)
+            count = session.execute(count_stmt).scalar_one()
+        listed = count <= CHANGE_FEED_MAX_TODOS
+
+        if rows is None and not deleted:
+            stmt = stmt.values(version=version)
+        if listed:
+            stmt = stmt.returning(*table.c)
+        if rows is not None:
+            result = session.execute(stmt, [{**row, "version": version} for row in rows])
+        else:
+            result = session.execute(stmt)
+        todos = [Todo.from_row(row) for row in result.all()] if listed else None
+        session.commit()
+
+    table.info["change_feed"].publish(
+        TodoChange(
+            version=version,
+            todos=None
+            if todos is None
+            else {todo.id: None if deleted else todo for todo in todos},
+        )
+    )
+    return version, count if todos is None else len(todos)
+
+
+def flush_todo_writes(
+    connection: MeteredConnection, table: Table, writes: List[PendingWrite]
+) -> Tuple[int, List[PendingWrite], Dict[PendingWrite, Exception]]:
+    """Runs a batch of queued writes as one transaction under a single version bump.
+    Returns the new table version, the writes that applied and the errors
+    of the writes the database refused, by write.
+
+    Each update or delete only matches its todo at the version its session saw.
+    Writes matching nothing lost to a concurrent edit and are left out.
+    Each write runs in its own savepoint, so one the database refuses,
+    a title too long for its column say, is undone without the others.
+    """
+    version_table = table.metadata.tables[VERSION_TABLE_NAME]
+    applied = []
+    errors = {}
+    todos = {}
+    with connection.session as session:
+        version = session.execute(
+            version_table.update()
+            .values(version=version_table.c.version + 1)
+            .returning(version_table.c.version)
+        ).scalar_one()
+        for write in writes:
+            condition = sa.and_(
+                table.c.id == write.todo_id, table.c.version == write.base_version
+            )
+            if write.values is None:
+                stmt = table.delete().where(condition)
+            else:
+                stmt = table.update().where(condition).values(**write.values, version=version)
+            try:
+                with session.begin_nested():
+                    row = session.execute(stmt.returning(*table.c)).first()
+            except sa.exc.DBAPIError as e:
+                errors[write] = e
+                continue
+            if row is not None:
+                applied.append(write)
+                todos[write.todo_id] = None if write.values is None else Todo.from_row(row)
+        session.commit()
+
+    table.info["change_feed"].publish(TodoChange(version=version, todos=todos))
+    return version, applied, errors
+
+
+def get_write_outbox() -> WriteOutbox:
+    return st.session_state.setdefault(SESSION_STATE_KEY_WRITE_OUTBOX, WriteOutbox())
+
+
+def queue_todo_write(
+    connection: MeteredConnection, table: Table, todo_id: int, values: Optional[dict]
+):
+    """Shows an edit of a todo on the page right away and queues its write.
+    Pass None as `values` to delete the todo.
+    """
+    todos = st.session_state[SESSION_STATE_KEY_TODOS]
+    current = todos[todo_id]
+    table.info["write_queue"].put(
+        connection,
+        PendingWrite(
+            todo_id=todo_id,
+            title=current.title,
+            values=values,
+            base_version=current.version,
+            outbox=get_write_outbox(),
+        ),
+    )
+
+    todo_item = None if values is None else replace(current, **values)
+    if not apply_todo_row(todo_id, todo_item):
+        # The edit reshapes the page, which only the database can fill again.
+        # Show it in place until then, sync_todos reloads once the queue wrote it.
+        if todo_item is None:
+            del todos[todo_id]
+        else:
+            todos[todo_id] = todo_item
+        st.session_state[SESSION_STATE_KEY_TODOS_STALE] = True
+
+
+def report_write_failures(connection: MeteredConnection, table: Table):
+    """Toasts the queued writes of this session that failed since its last run,
+    and rolls back their edits by reloading the page from the database.
+    """
+    failures = get_write_outbox().collect()
+    for failure in failures:
+        st.toast(failure, icon="⚠️")
+    if failures:
+        reload_todos(connection, table)
+
+
+def mark_todos_done(
+    connection: MeteredConnection, table: Table, todo_ids: Optional[Iterable[int]] = None
+) -> int:
+    """Marks the given todos, or every todo, as done in one UPDATE. Returns how many changed."""
+    stmt = table.update().where(table.c.done.is_not(True)).values(done=True)
+    if todo_ids is not None:
+        stmt = stmt.where(table.c.id.in_(list(todo_ids)))
+    return write_todos(connection, table, stmt)[1]
+
+
+def delete_todos(
+    connection: MeteredConnection,
+    table: Table,
+    todo_ids: Optional[Iterable[int]] = None,
+    done_only: bool = False,
+) -> int:
+    """Deletes the given todos, or every todo, in one DELETE. Returns how many were deleted."""
+    stmt = table.delete()
+    if todo_ids is not None:
+        stmt = stmt.where(table.c.id.in_(list(todo_ids)))
+    if done_only:
+        stmt = stmt.where(table.c.done.is_(True))
+    return write_todos(connection, table, stmt)[1]
+
+
+def reschedule_todos(
+    connection: MeteredConnection, table: Table, todo_ids: Iterable[int], due_at: date
+) -> int:
+    """Moves the due date of the given todos in one UPDATE. Returns how many changed."""
+    stmt = table.update().where(table.c.id.in_(list(todo_ids))).values(due_at=due_at)
+    return write_todos(connection, table, stmt)[1]
+
+
+def import_todos(connection: MeteredConnection, table: Table, csv_text: str) -> int:
+    """Inserts every row of a CSV with a title column, and optional description,
+    due_at (YYYY-MM-DD) and done columns, in one transaction. Returns how many were added.
+    Todos without a due_at are due today, as the Add todo form defaults to.
+    """
+    reader = csv.DictReader(io.StringIO(csv_text))
+    today = date.today()
+    rows = [
+        {
+            "title": row["title"],
+            "description": row.get("description") or None,
+            "created_at": today,
+            "due_at": date.fromisoformat(row["due_at"]) if row.get("due_at") else today,
+            "done": (row.get("done") or "").strip().lower() in ("1", "true", "yes"),
+        }
+        for row in reader
+        if row.get("title")
+    ]
+    if not rows:
+        return 0
+    return write_todos(connection, table, table.insert(), rows)[1]
+
+
+def reload_todos(connection: MeteredConnection, table: Table):
+    """Loads the page of todos selected by the filter, sort and page widgets into session state."""
+    st.session_state[SESSION_STATE_KEY_TODOS_STALE] = False
+    cursors = st.session_state.setdefault(SESSION_STATE_KEY_TODOS_CURSORS, [None])
+    todos, has_next, version = load_todo_window(
+        connection,
+        table,
+        TODO_FILTERS[st.session_state.get("todos_filter", "All")],
+        st.session_state.get("todos_sort", "Created"),
+        cursors[-1],
+        st.session_state.get("todos_search", ""),
+    )
+    st.session_state[SESSION_STATE_KEY_TODOS] = todos
+    st.session_state[SESSION_STATE_KEY_TODOS_HAS_NEXT] = has_next
+    st.session_state[SESSION_STATE_KEY_TODOS_VERSION] = version
+
+
+def apply_todo_change(change: TodoChange) -> bool:
+    """Applies a change to the page of todos in session state.
+
+    Returns False when the page must be reloaded instead: a todo entered or left
+    the page, or moved within it, or the change touched too many todos to list them.
+    """
+    if change.todos is None:
+        return False
+    return all(
+        apply_todo_row(todo_id, todo_item) for todo_id, todo_item in change.todos.items()
+    )
+
+
+def apply_todo_row(todo_id: int, todo_item: Optional[Todo]) -> bool:
+    todos = st.session_state[SESSION_STATE_KEY_TODOS]
+    on_page = todo_id in todos
+    if todo_item is None:
+        return not on_page
+
+    if st.session_state.get("todos_search"):
+        # Whether a todo matches the search is up to the database,
+        # only an edit leaving the searched text alone is applied in place
+        if not on_page:
+            return False
+        current = todos[todo_id]
+        if (current.title, current.description) != (todo_item.title, todo_item.description):
+            return False
+
+    done_filter = TODO_FILTERS[st.session_state.get("todos_filter", "All")]
+    if done_filter is not None and todo_item.done != done_filter:
+        return not on_page
+
+    sort = st.session_state.get("todos_sort", "Created")
+    sort_key = todo_sort_key(todo_item, sort)
+    if on_page:
+        if todo_sort_key(todos[todo_id], sort) != sort_key:
+            return False
+        todos[todo_id] = todo_item
+        return True
+
+    # A todo outside the page only matters if it sorts between its first and last todo
+    sort_order = todo_sort_order(sort_key)
+    cursor = st.session_state[SESSION_STATE_KEY_TODOS_CURSORS][-1]
+    if cursor is not None and sort_order <= todo_sort_order(tuple(cursor)):
+        return True
+    if st.session_state[SESSION_STATE_KEY_TODOS_HAS_NEXT]:
+        last_todo = next(reversed(todos.values()))
+        return sort_order > todo_sort_order(todo_sort_key(last_todo, sort))
+    return False
+
+
+def sync_todos(connection: MeteredConnection, table: Table) -> bool:
+    """Applies the change feed entries this session has not seen yet to session state.
+    Returns whether any todo changed.
+
+    Falls back to reloading the page when the feed is missing some of them,
+    as session state would otherwise miss those writes, when a change
+    reshapes the page, or when queued edits of this session did and are now written.
+    """
+    if SESSION_STATE_KEY_TODOS not in st.session_state:
+        reload_todos(connection, table)
+        return True
+    if st.session_state.get(SESSION_STATE_KEY_TODOS_STALE) and not get_write_outbox().pending:
+        reload_todos(connection, table)
+        return True
+
+    changes = table.info["change_feed"].since(
+        st.session_state[SESSION_STATE_KEY_TODOS_VERSION],
+        lambda: read_todo_version(connection, table),
+    )
+    if changes is None:
+        reload_todos(connection, table)
+        return True
+
+    for change in changes:
+        if not apply_todo_change(change):
+            reload_todos(connection, table)
+            return True
+    if changes:
+        st.session_state[SESSION_STATE_KEY_TODOS_VERSION] = changes[-1].version
+    return bool(changes)
 
 
 ##################################################
@@ -100,10 +894,12 @@ def load_todo(connection: SQLConnection, table: Table, todo_id: int) -> Optional
 # The usual workflow for those callbacks is:
 # 1. Get form input data through st.session_state form widget keys,
 # 2. Perform database operations,
-# 3. Refresh session state by reading from database.
+# 3. Catch session state up with the change feed, which now holds the write.
+# Edits of a single todo instead apply to session state right away and go
+# through the write queue, failures show up on a later run (see report_write_failures).
 
 
-def create_todo_callback(connection: SQLConnection, table: Table):
+def create_todo_callback(connection: MeteredConnection, table: Table):
     # 1. Get form input data
     if not st.session_state.new_todo_form__title:
         st.toast("Title empty, not adding todo")
@@ -119,13 +915,30 @@ def create_todo_callback(connection: SQLConnection, table: Table):
 
     # 2. Perform database operations
     stmt = table.insert().values(**new_todo_data)
-    with connection.session as session:
-        # probably needs a try...except but eh
-        session.execute(stmt)
-        session.commit()
+    # probably needs a try...except but eh
+    write_todos(connection, table, stmt)
+
+    # 3. Sync session state from change feed
+    sync_todos(connection, table)
+
 
-    # 3. Refresh session state from database
-    st.session_state[SESSION_STATE_KEY_TODOS] = load_all_todos(conn, todo_table)
+def change_view_callback():
+    # Filter or sort changed, start again from the first page
+    st.session_state[SESSION_STATE_KEY_TODOS_CURSORS] = [None]
+    st.session_state.pop(SESSION_STATE_KEY_TODOS, None)
+
+
+def next_page_callback():
+    last_todo = next(reversed(st.session_state[SESSION_STATE_KEY_TODOS].values()))
+    st.session_state[SESSION_STATE_KEY_TODOS_CURSORS].append(
+        todo_sort_key(last_todo, st.session_state.todos_sort)
+    )
+    st.session_state.pop(SESSION_STATE_KEY_TODOS, None)
+
+
+def previous_page_callback():
+    st.session_state[SESSION_STATE_KEY_TODOS_CURSORS].pop()
+    st.session_state.pop(SESSION_STATE_KEY_TODOS, None)
 
 
 def open_update_callback(todo_id: int):
@@ -136,7 +949,7 @@ def cancel_update_callback(todo_id: int):
     st.session_state[f"currently_editing__{todo_id}"] = False
 
 
-def update_todo_callback(connection: SQLConnection, table: Table, todo_id: int):
+def update_todo_callback(connection: MeteredConnection, table: Table, todo_id: int):
     # 1. Get form input data
     updated_values = {
         "title": st.session_state[f"edit_todo_form_{todo_id}__title"],
@@ -149,49 +962,95 @@ def update_todo_callback(connection: SQLConnection, table: Table, todo_id: int):
         st.session_state[f"currently_editing__{todo_id}"] = True
         return
 
-    # 2. Perform database operations
-    stmt = table.update().where(table.c.id == todo_id).values(**updated_values)
-    with connection.session as session:
-        session.execute(stmt)
-        session.commit()
-
-    # 3. Refresh session state from database
-    st.session_state[SESSION_STATE_KEY_TODOS][todo_id] = load_todo(
-        connection, table, todo_id
-    )
+    # 2. Show the edit and queue its database write
+    queue_todo_write(connection, table, todo_id, updated_values)
     st.session_state[f"currently_editing__{todo_id}"] = False
 
 
-def delete_todo_callback(connection: SQLConnection, table: Table, todo_id: int):
+def delete_todo_callback(connection: MeteredConnection, table: Table, todo_id: int):
     # 1. Get form input data
 
-    # 2. Perform database operations
-    stmt = table.delete().where(table.c.id == todo_id)
-    with connection.session as session:
-        session.execute(stmt)
-        session.commit()
-
-    # 3. Refresh session state from database
-    st.session_state[SESSION_STATE_KEY_TODOS] = load_all_todos(conn, todo_table)
+    # 2. Remove the todo and queue its database delete
+    queue_todo_write(connection, table, todo_id, None)
     st.session_state[f"currently_editing__{todo_id}"] = False
+    get_selected_todo_ids().discard(todo_id)
 
 
-def mark_done_callback(connection: SQLConnection, table: Table, todo_id: int):
+def mark_done_callback(connection: MeteredConnection, table: Table, todo_id: int):
     # 1. Get form input data
     current_done_status = st.session_state[SESSION_STATE_KEY_TODOS][todo_id].done
 
-    # 2. Perform database operations
-    stmt = (
-        table.update().where(table.c.id == todo_id).values(done=not current_done_status)
-    )
-    with connection.session as session:
-        session.execute(stmt)
-        session.commit()
+    # 2. Show the edit and queue its database write
+    queue_todo_write(connection, table, todo_id, {"done": not current_done_status})
 
-    # 3. Refresh session state from database
-    st.session_state[SESSION_STATE_KEY_TODOS][todo_id] = load_todo(
-        connection, table, todo_id
-    )
+
+# Bulk callbacks act on the todos selected with the card checkboxes,
+# which stay selected across pages until the bulk action runs.
+
+
+def get_selected_todo_ids() -> set:
+    return st.session_state.setdefault(SESSION_STATE_KEY_SELECTED_TODOS, set())
+
+
+def toggle_selection_callback(todo_id: int):
+    get_selected_todo_ids().symmetric_difference_update({todo_id})
+
+
+def clear_selection_callback():
+    selected = get_selected_todo_ids()
+    for todo_id in selected:
+        st.session_state.pop(f"select_todo_{todo_id}", None)
+    selected.clear()
+
+
+def mark_selected_done_callback(connection: MeteredConnection, table: Table):
+    count = mark_todos_done(connection, table, get_selected_todo_ids())
+    clear_selection_callback()
+    sync_todos(connection, table)
+    st.toast(f"Marked {count} todos done", icon="✅")
+
+
+def delete_selected_callback(connection: MeteredConnection, table: Table):
+    count = delete_todos(connection, table, get_selected_todo_ids())
+    clear_selection_callback()
+    sync_todos(connection, table)
+    st.toast(f"Deleted {count} todos", icon="🗑️")
+
+
+def reschedule_selected_callback(connection: MeteredConnection, table: Table):
+    due_at = st.session_state.bulk_actions__due_date
+    count = reschedule_todos(connection, table, get_selected_todo_ids(), due_at)
+    clear_selection_callback()
+    sync_todos(connection, table)
+    st.toast(f"Moved {count} todos to {due_at.strftime('%Y-%m-%d')}", icon="📅")
+
+
+def mark_all_done_callback(connection: MeteredConnection, table: Table):
+    count = mark_todos_done(connection, table)
+    sync_todos(connection, table)
+    st.toast(f"Marked {count} todos done", icon="✅")
+
+
+def delete_completed_callback(connection: MeteredConnection, table: Table):
+    count = delete_todos(connection, table, done_only=True)
+    get_selected_todo_ids().clear()
+    sync_todos(connection, table)
+    st.toast(f"Deleted {count} completed todos", icon="🗑️")
+
+
+def import_todos_callback(connection: MeteredConnection, table: Table):
+    csv_file = st.session_state.import_todos__file
+    if csv_file is None:
+        st.toast("Pick a CSV file to import first", icon="⚠️")
+        return
+
+    try:
+        count = import_todos(connection, table, csv_file.getvalue().decode("utf-8-sig"))
+    except (KeyError, ValueError, UnicodeDecodeError) as e:
+        st.toast(f"Could not import {csv_file.name}: {e}", icon="⚠️")
+        return
+    sync_todos(connection, table)
+    st.toast(f"Imported {count} todos", icon="📥")
 
 
 ##################################################
@@ -203,13 +1062,17 @@ def mark_done_callback(connection: SQLConnection, table: Table, todo_id: int):
 
 
 # Function to display a single todo item as a card
-def todo_card(connection: SQLConnection, table: Table, todo_item: Todo):
+def todo_card(connection: MeteredConnection, table: Table, todo_item: Todo):
     todo_id = todo_item.id
 
     with st.container(border=True):
         display_title = todo_item.title
         display_description = todo_item.description or ":grey[*No description*]"
-        display_due_date = f":grey[Due {todo_item.due_at.strftime('%Y-%m-%d')}]"
+        display_due_date = (
+            f":grey[Due {todo_item.due_at.strftime('%Y-%m-%d')}]"
+            if todo_item.due_at
+            else ":grey[*No due date*]"
+        )
 
         if todo_item.done:
             strikethrough = "~~"
@@ -251,7 +1114,7 @@ def todo_card(connection: SQLConnection, table: Table, todo_item: Todo):
 
 
 # Function to display the inline form for editing an existing todo item
-def todo_edit_widget(connection: SQLConnection, table: Table, todo_item: Todo):
+def todo_edit_widget(connection: MeteredConnection, table: Table, todo_item: Todo):
     todo_id = todo_item.id
 
     with st.form(f"edit_todo_form_{todo_id}"):
@@ -297,10 +1160,13 @@ def todo_edit_widget(connection: SQLConnection, table: Table, todo_item: Todo):
 
 
 @st.fragment
-def todo_component(connection: SQLConnection, table: Table, todo_id: int):
+def todo_component(connection: MeteredConnection, table: Table, todo_id: int):
     # Load todo item fields from session state
     # Syncing from database to session state was done in callback
-    todo_item = st.session_state[SESSION_STATE_KEY_TODOS][todo_id]
+    todo_item = st.session_state[SESSION_STATE_KEY_TODOS].get(todo_id)
+    if todo_item is None:
+        # Deleted by another session, the change feed listener redraws the list
+        return
 
     currently_editing = st.session_state.get(f"currently_editing__{todo_id}", False)
 
@@ -311,13 +1177,76 @@ def todo_component(connection: SQLConnection, table: Table, todo_id: int):
         todo_edit_widget(connection, table, todo_item)
 
 
+def pool_health_widget(metrics: PoolMetrics):
+    pool_status = metrics.pool_status()
+    size_col, in_use_col, overflow_col = st.columns(3)
+    size_col.metric("Pool size", pool_status["size"])
+    in_use_col.metric("In use", pool_status["checked_out"])
+    overflow_col.metric("Overflow", pool_status["overflow"])
+
+    def format_ms(value):
+        return "-" if value is None else f"{value:.1f} ms"
+
+    wait_col, p50_col, p99_col = st.columns(3)
+    wait_col.metric("Checkout p95", format_ms(metrics.checkout_wait.percentile(0.95)))
+    p50_col.metric("Query p50", format_ms(metrics.query_latency.percentile(0.5)))
+    p99_col.metric("Query p99", format_ms(metrics.query_latency.percentile(0.99)))
+
+    st.caption(
+        f"{metrics.query_latency.total} queries, "
+        f"slowest {format_ms(metrics.query_latency.max_ms)}. Query latency:"
+    )
+    st.bar_chart(
+        [
+            {"latency": bucket, "queries": count}
+            for bucket, count in metrics.query_latency.as_dict().items()
+        ],
+        x="latency",
+        y="queries",
+        height=160,
+        sort=False,
+    )
+
+    slow_queries = metrics.recent_slow_queries()
+    if slow_queries:
+        st.caption(f"Slow queries (≥ {metrics.slow_query_ms:g} ms)")
+        st.dataframe(
+            [
+                {"ms": round(query.duration_ms), "statement": query.statement}
+                for query in slow_queries
+            ],
+            hide_index=True,
+        )
+
+
+# Polls the in-memory change feed, so other sessions' writes show up within a few
+# seconds at the cost of a lock and a list scan per session. The database is only
+# asked for its table version, once per poll interval for the whole process.
+# The whole app reruns only when session state moved past what the list displays,
+# or to roll back and report queued writes of this session that failed.
+@st.fragment(run_every=CHANGE_FEED_POLL_SECONDS)
+def change_feed_listener(connection: MeteredConnection, table: Table, displayed_version: int):
+    sync_todos(connection, table)
+    if (
+        st.session_state[SESSION_STATE_KEY_TODOS_VERSION] != displayed_version
+        or get_write_outbox().has_failures
+    ):
+        st.rerun(scope="app")
+
+
 ##################################################
 ### USER INTERFACE
 ##################################################
 
 st.title("Streamlit Todo App")
 
-conn = st.connection("todo_db", ttl=5 * 60)
+# Pool settings come from the sidebar widgets of the previous run.
+# st.connection caches one engine per combination of settings.
+pool_settings = {
+    name: st.session_state.get(f"pool_settings__{name}", default)
+    for name, default in DEFAULT_POOL_SETTINGS.items()
+}
+conn = MeteredConnection(st.connection("todo_db", ttl=5 * 60, **pool_settings).engine)
 metadata_obj, todo_table = connect_table()
 
 # --- Sidebar for Admin Actions ---
@@ -326,36 +1255,195 @@ with st.sidebar:
     if st.button(
         "Create table",
         type="secondary",
-        help="Creates the 'todo' table if it doesn't exist.",
+        help="Creates the 'todo' table if it doesn't exist, or upgrades it to the latest schema.",
     ):
-        metadata_obj.create_all(conn.engine)
-        st.toast("Todo table created successfully!", icon="✅")
+        applied_migrations = migrate_schema(conn, metadata_obj)
+        if applied_migrations:
+            st.toast(
+                f"Todo table at schema version {SCHEMA_VERSION}: {', '.join(applied_migrations)}",
+                icon="✅",
+            )
+        else:
+            st.toast("Todo table already up to date", icon="✅")
+
+    st.file_uploader(
+        "Import todos from CSV",
+        type="csv",
+        key="import_todos__file",
+        help="Columns: title, and optionally description, due_at (YYYY-MM-DD), done.",
+    )
+    st.button(
+        "Import",
+        icon=":material/upload:",
+        on_click=import_todos_callback,
+        args=(conn, todo_table),
+    )
 
     st.divider()
-    st.subheader("Session State Debug", help="Is not updated by fragment rerun!")
-    st.json(st.session_state)
+    st.subheader(
+        "Connection pool",
+        help="Changing a setting opens a new pool. Metrics are not updated by fragment rerun!",
+    )
+    pool_size_col, overflow_col = st.columns(2)
+    pool_size_col.number_input(
+        "Pool size",
+        min_value=1,
+        max_value=100,
+        value=DEFAULT_POOL_SETTINGS["pool_size"],
+        key="pool_settings__pool_size",
+    )
+    overflow_col.number_input(
+        "Max overflow",
+        min_value=0,
+        max_value=100,
+        value=DEFAULT_POOL_SETTINGS["max_overflow"],
+        key="pool_settings__max_overflow",
+    )
+    st.toggle(
+        "Pre-ping connections",
+        value=DEFAULT_POOL_SETTINGS["pool_pre_ping"],
+        key="pool_settings__pool_pre_ping",
+        help="Checks each connection is alive before handing it out.",
+    )
+    pool_health_widget(conn.metrics)
 
 # --- Display list of Todo items ---
 
-# 1. Check if database table exists. Else redirect to admin sidebar for creation
-if not check_table_exists(conn, TABLE_NAME):
+st.text_input(
+    "Search",
+    key="todos_search",
+    placeholder="Search titles and descriptions",
+    on_change=change_view_callback,
+    icon=":material/search:",
+)
+filter_col, sort_col = st.columns(2)
+filter_col.selectbox(
+    "Show", TODO_FILTERS.keys(), key="todos_filter", on_change=change_view_callback
+)
+sort_col.selectbox(
+    "Sort by", TODO_SORTS.keys(), key="todos_sort", on_change=change_view_callback
+)
+
+# 1. Check the database schema is up to date. Else redirect to admin sidebar for creation.
+#    The schema version is read once per process, not on every run.
+schema_version = get_schema_version(conn, metadata_obj)
+if schema_version == 0:
     st.warning("Create table from admin sidebar", icon="⚠")
     st.stop()
+if schema_version < SCHEMA_VERSION:
+    st.warning(
+        f"Todo table at schema version {schema_version} of {SCHEMA_VERSION}, "
+        "upgrade it with Create table from admin sidebar",
+        icon="⚠",
+    )
+    st.stop()
 
-# 2. Load database items into session state.
-#    This happens on the first run or if the state was cleared.
+# 2. Load the current page of database items into session state.
+#    This happens on the first run, when the state was cleared or the page changed.
+#    Later runs only apply the changes other sessions published meanwhile.
 if SESSION_STATE_KEY_TODOS not in st.session_state:
     with st.spinner("Loading Todos..."):
-        st.session_state[SESSION_STATE_KEY_TODOS] = load_all_todos(conn, todo_table)
+        reload_todos(conn, todo_table)
+else:
+    sync_todos(conn, todo_table)
+report_write_failures(conn, todo_table)
+
+
+# 3. Display bulk actions
+selected_count = len(get_selected_todo_ids())
+with st.expander(f"Bulk actions ({selected_count} selected)", icon=":material/checklist:"):
+    done_col, delete_col, clear_col = st.columns(3)
+    done_col.button(
+        "Mark selected done",
+        on_click=mark_selected_done_callback,
+        args=(conn, todo_table),
+        disabled=not selected_count,
+        use_container_width=True,
+    )
+    delete_col.button(
+        "Delete selected",
+        on_click=delete_selected_callback,
+        args=(conn, todo_table),
+        disabled=not selected_count,
+        use_container_width=True,
+    )
+    clear_col.button(
+        "Clear selection",
+        on_click=clear_selection_callback,
+        disabled=not selected_count,
+        use_container_width=True,
+    )
 
+    date_col, reschedule_col = st.columns((1, 2), vertical_alignment="bottom")
+    date_col.date_input("New due date", key="bulk_actions__due_date")
+    reschedule_col.button(
+        "Reschedule selected",
+        icon=":material/event:",
+        on_click=reschedule_selected_callback,
+        args=(conn, todo_table),
+        disabled=not selected_count,
+        use_container_width=True,
+    )
+
+    st.divider()
+    all_done_col, delete_completed_col = st.columns(2)
+    all_done_col.button(
+        "Mark all done",
+        icon=":material/done_all:",
+        on_click=mark_all_done_callback,
+        args=(conn, todo_table),
+        use_container_width=True,
+    )
+    delete_completed_col.button(
+        "Delete completed",
+        icon=":material/delete_sweep:",
+        on_click=delete_completed_callback,
+        args=(conn, todo_table),
+        use_container_width=True,
+    )
 
-# 3. Display Todos from Session State
+# 4. Display the page of Todos from Session State
+#    Only this page is rendered, so rerun cost depends on page size, not table size
 current_todos: Dict[int, Todo] = st.session_state.get(SESSION_STATE_KEY_TODOS, {})
+if not current_todos:
+    st.info("No todos here.", icon=":material/inbox:")
 for todo_id in current_todos.keys():
     # Initialize editing state for todo item
     if f"currently_editing__{todo_id}" not in st.session_state:
         st.session_state[f"currently_editing__{todo_id}"] = False
-    todo_component(conn, todo_table, todo_id)
+    # The checkbox sits outside the card fragment,
+    # so toggling it reruns the app and updates the bulk actions
+    select_col, card_col = st.columns((1, 15))
+    select_col.checkbox(
+        "Select",
+        value=todo_id in get_selected_todo_ids(),
+        key=f"select_todo_{todo_id}",
+        on_change=toggle_selection_callback,
+        args=(todo_id,),
+        label_visibility="collapsed",
+    )
+    with card_col:
+        todo_component(conn, todo_table, todo_id)
+
+page_number = len(st.session_state[SESSION_STATE_KEY_TODOS_CURSORS])
+previous_col, page_col, next_col = st.columns(3, vertical_alignment="center")
+previous_col.button(
+    "Previous",
+    icon=":material/chevron_left:",
+    on_click=previous_page_callback,
+    disabled=page_number == 1,
+    use_container_width=True,
+)
+page_col.markdown(f"<div style='text-align: center'>Page {page_number}</div>", unsafe_allow_html=True)
+next_col.button(
+    "Next",
+    icon=":material/chevron_right:",
+    on_click=next_page_callback,
+    disabled=not st.session_state[SESSION_STATE_KEY_TODOS_HAS_NEXT],
+    use_container_width=True,
+)
+
+change_feed_listener(conn, todo_table, st.session_state[SESSION_STATE_KEY_TODOS_VERSION])
 
 # --- Display create Todo form ---
 
@@ -0,0 +1,30 @@
+"""The Todo record of the todo app.
+
+Slotted, so an instance carries no per-object __dict__ and takes about a
+third of the memory. Frozen, because the change feed hands the same
+instances to every session: edits go through dataclasses.replace().
+"""
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional
+
+
+@dataclass(frozen=True, slots=True)
+class Todo:
+    id: Optional[int] = None
+    title: str = ""
+    description: Optional[str] = None
+    created_at: Optional[date] = None
+    due_at: Optional[date] = None
+    done: bool = False
+    version: int = 0
+
+    # Class method to easily create a Todo object from a database row
+    @classmethod
+    def from_row(cls, row):
+        if row:
+            # Rows of select(todo_table) and RETURNING *todo_table.c list the columns
+            # in field order, unpacking them skips building a mapping per row
+            return cls(*row)
+        return None
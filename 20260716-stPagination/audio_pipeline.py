@@ -0,0 +1,115 @@
+"""Decode audio clips on demand from an Arrow-backed dataset, a few clips ahead of the reviewer.
+
+The dataset keeps its audio column undecoded (``Audio(decode=False)``), so
+rows stay as memory-mapped bytes until a clip is asked for. Decoded clips go
+into a bounded LRU keyed by sample id, and the clips after the current one
+are decoded on a worker pool while the reviewer listens.
+"""
+
+import io
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import soundfile as sf
+
+from inflight import InflightRequests
+
+# Containers browsers play natively: their bytes can be sent untouched.
+BROWSER_FORMATS = {"FLAC": "audio/flac", "OGG": "audio/ogg", "MP3": "audio/mpeg", "WAV": "audio/wav"}
+
+
+@dataclass(frozen=True)
+class Clip:
+    sample_id: str
+    speaker_id: int
+    text: str
+    sample_rate: int
+    # Float PCM samples, or encoded bytes when `mime_type` is set.
+    audio: np.ndarray | bytes
+    mime_type: str | None = None
+
+
+def encode_clip(audio_bytes: bytes) -> tuple[bytes, str, int]:
+    """Return browser-playable compressed bytes, re-encoding to Ogg Vorbis only when needed."""
+    info = sf.info(io.BytesIO(audio_bytes))
+    if info.format in BROWSER_FORMATS:
+        return audio_bytes, BROWSER_FORMATS[info.format], info.samplerate
+    data, sample_rate = sf.read(io.BytesIO(audio_bytes), dtype="float32")
+    buffer = io.BytesIO()
+    sf.write(buffer, data, sample_rate, format="OGG", subtype="VORBIS")
+    return buffer.getvalue(), BROWSER_FORMATS["OGG"], sample_rate
+
+
+class ClipPipeline:
+    def __init__(self, dataset, max_cached: int = 64, lookahead: int = 2, max_workers: int = 2):
+        self.dataset = dataset
+        self.max_cached = max_cached
+        self.lookahead = lookahead
+        self.hits = 0
+        self.misses = 0
+        # Only the id column is read eagerly, audio bytes stay on disk.
+        self._sample_ids = [str(sample_id) for sample_id in dataset["id"]]
+        self._lock = threading.Lock()
+        self._cache: OrderedDict[tuple[str, bool], Clip] = OrderedDict()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="audio-decode")
+        self._inflight = InflightRequests()
+
+    def __len__(self) -> int:
+        return len(self._sample_ids)
+
+    def _decode(self, index: int, compressed: bool) -> Clip:
+        sample = self.dataset[index]
+        audio_bytes = sample["audio"]["bytes"]
+        if compressed:
+            audio, mime_type, sample_rate = encode_clip(audio_bytes)
+        else:
+            audio, sample_rate = sf.read(io.BytesIO(audio_bytes), dtype="float32")
+            mime_type = None
+        clip = Clip(str(sample["id"]), sample["speaker_id"], sample["text"], sample_rate, audio, mime_type)
+
+        with self._lock:
+            self._cache[(clip.sample_id, compressed)] = clip
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+        return clip
+
+    def _submit(self, index: int, compressed: bool):
+        key = (self._sample_ids[index], compressed)
+        return self._inflight.submit(self._executor, key, self._decode, index, compressed)
+
+    def get(self, index: int, compressed: bool = False) -> Clip:
+        """Return clip ``index``, then start decoding the ones after it."""
+        key = (self._sample_ids[index], compressed)
+        with self._lock:
+            clip = self._cache.get(key)
+            if clip is not None:
+                self._cache.move_to_end(key)
+        if clip is None:
+            # Waiting on a lookahead decode already under way still counts as a hit.
+            if key in self._inflight:
+                self.hits += 1
+            else:
+                self.misses += 1
+            clip = self._submit(index, compressed).result()
+        else:
+            self.hits += 1
+
+        self.prefetch(index, compressed)
+        return clip
+
+    def prefetch(self, index: int, compressed: bool = False) -> None:
+        for ahead in range(index + 1, min(index + 1 + self.lookahead, len(self))):
+            if (self._sample_ids[ahead], compressed) not in self._cache:
+                self._submit(ahead, compressed)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "cached_clips": len(self._cache),
+        }
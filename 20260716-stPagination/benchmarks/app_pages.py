@@ -0,0 +1,181 @@
+"""Rerun time, cache hit rate and peak memory per page flip, for every demo page.
+
+Drives streamlit_app.py headlessly with `AppTest`: each page is opened, then
+flipped through ``--flips`` page changes. Hacker News, Picsum and GitHub are
+served by the local stubs and the audio dataset is synthetic, so runs are
+offline and comparable over time. Results are printed (or written) as JSON.
+
+    python benchmarks/app_pages.py --flips 20 --latency 0.05 --output results.json
+    python benchmarks/app_pages.py --pages dataframe_demo api_results_demo
+
+Every run starts from an empty working directory (``--workdir`` reuses one,
+to measure warm disk caches). Peak memory comes from ``tracemalloc``, so it
+covers Python and NumPy allocations only and slows every run down a little.
+Pages share the process, so a page's peak includes what the pages before it
+still hold: benchmark a page on its own with ``--pages`` to isolate it.
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import datasets
+
+APP_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(APP_DIR))
+from stubs import fake_audio_dataset, fake_github_server, fake_hn_server, fake_picsum_server  # noqa: E402
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+SUPERSTORE_CSV = APP_DIR / "data" / "Superstore_2024.csv"
+# Search gets a budget well above what a run spends: this measures rendering,
+# not how the app behaves once rate limited.
+GITHUB_RATE_LIMIT = 100_000
+
+# Per page: the session state key of its st.pagination, the last page the
+# flips wrap around at, and the name its cache is listed under in
+# st.session_state["prefetchers"] (None for pages without one).
+PAGES = {
+    "dataframe_demo": ("selected_page", 1000, None),
+    "api_results_demo": (
+        f"api_page_{fake_hn_server.story_ids()[0]}",
+        -(-fake_hn_server.COMMENTS_PER_STORY // 3),
+        "api_comments",
+    ),
+    "audio_review_demo": ("audio_page", fake_audio_dataset.NUM_CLIPS, "audio_clips"),
+    "image_gallery_demo": ("gallery_page", 10, "gallery"),
+    "model_inference_demo": ("digits_page_Test set order", 360, None),
+    "search_results_demo": ("search_page", 166, "search"),
+}
+
+
+def open_page(at: AppTest, name: str) -> AppTest:
+    # The default page is registered under an empty url_pathname.
+    page_hash = next(
+        (h for h, page in at._registered_pages.items() if page.get("url_pathname") == name),
+        next(h for h, page in at._registered_pages.items() if page.get("url_pathname") == ""),
+    )
+    at._page_hash = page_hash
+    return at.run()
+
+
+def flip_order(last_page: int, flips: int, pattern: str) -> list[int]:
+    if pattern == "random":
+        return [random.randint(1, last_page) for _ in range(flips)]
+    # Forward from page 2, wrapping back to page 1 after the last page.
+    return [i % last_page + 1 for i in range(1, flips + 1)]
+
+
+def summarize(timings: list[float]) -> dict:
+    timings = sorted(timings)
+    return {
+        "median_ms": round(statistics.median(timings), 1),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 1),
+        "max_ms": round(timings[-1], 1),
+    }
+
+
+def bench_page(name: str, flips: int, pattern: str, timeout: float) -> dict:
+    page_key, last_page, cache_name = PAGES[name]
+    tracemalloc.reset_peak()
+
+    at = AppTest.from_file(str(APP_DIR / "streamlit_app.py"), default_timeout=timeout)
+    at.run()
+    start = time.perf_counter()
+    open_page(at, name)
+    first_run_ms = (time.perf_counter() - start) * 1000
+
+    timings = []
+    for page in flip_order(last_page, flips, pattern):
+        at.session_state[page_key] = page
+        start = time.perf_counter()
+        at.run()
+        timings.append((time.perf_counter() - start) * 1000)
+        if at.exception:
+            break
+
+    cache = at.session_state["prefetchers"].get(cache_name) if cache_name and "prefetchers" in at.session_state else None
+    cache_stats = cache.stats() if cache else None
+    return {
+        "flips": len(timings),
+        "first_run_ms": round(first_run_ms, 1),
+        "rerun": summarize(timings),
+        "cache_hit_rate": cache_stats["hit_rate"] if cache_stats else None,
+        "cache": cache_stats,
+        "peak_memory_mb": round(tracemalloc.get_traced_memory()[1] / 2**20, 1),
+        "exception": [e.message for e in at.exception] or None,
+    }
+
+
+def prepare_workdir(workdir: Path) -> None:
+    (workdir / "data").mkdir(parents=True, exist_ok=True)
+    csv_path = workdir / "data" / SUPERSTORE_CSV.name
+    if not csv_path.exists():
+        shutil.copy(SUPERSTORE_CSV, csv_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", nargs="+", choices=list(PAGES), default=list(PAGES))
+    parser.add_argument("--flips", type=int, default=20)
+    parser.add_argument("--pattern", choices=["sequential", "random"], default="sequential")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds the stub APIs add to every response")
+    parser.add_argument("--timeout", type=float, default=120, help="seconds a single script run may take")
+    parser.add_argument("--workdir", type=Path, help="reuse this directory's data/ caches instead of a fresh one")
+    parser.add_argument("--output", type=Path, help="write the JSON here instead of stdout")
+    args = parser.parse_args()
+    # Resolved before changing into the working directory below.
+    output_path = args.output.resolve() if args.output else None
+
+    hn_server, os.environ["HN_API_URL"] = fake_hn_server.start_server(latency=args.latency)
+    picsum_server, os.environ["PICSUM_URL"] = fake_picsum_server.start_server(latency=args.latency)
+    github_server, os.environ["GITHUB_API_URL"] = fake_github_server.start_server(
+        latency=args.latency, rate_limit=GITHUB_RATE_LIMIT
+    )
+    # Send gallery images through Streamlit rather than binding the proxy port.
+    os.environ.pop("IMAGE_PROXY_URL", None)
+    audio_dataset = fake_audio_dataset.build_dataset()
+    datasets.load_dataset = lambda *args, **kwargs: audio_dataset
+
+    workdir = args.workdir or Path(tempfile.mkdtemp(prefix="pagination-bench-"))
+    prepare_workdir(workdir)
+    # The app resolves its data/ paths against the working directory.
+    os.chdir(workdir)
+
+    random.seed(0)
+    tracemalloc.start()
+    results = {
+        "config": {
+            "flips": args.flips,
+            "pattern": args.pattern,
+            "stub_latency_s": args.latency,
+            "workdir": str(workdir),
+        },
+        "pages": {name: bench_page(name, args.flips, args.pattern, args.timeout) for name in args.pages},
+        "stub_requests": {
+            "hacker_news": sum(hn_server.requests.values()),
+            "picsum": sum(picsum_server.requests.values()),
+            "github": sum(github_server.requests.values()),
+        },
+    }
+    tracemalloc.stop()
+    if not args.workdir:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = json.dumps(results, indent=2)
+    if output_path:
+        output_path.write_text(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Page-flip latency: full `pd.read_csv` per rerun vs. memory-mapped `PagedTable` reads.
+
+Tiles the Superstore CSV (or a synthetic frame if it is missing) up to each
+requested row count, then times flipping to random pages both ways.
+
+    python benchmarks/dataframe_pages.py --rows 100000 1000000 10000000
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from paged_table import PagedTable  # noqa: E402
+
+ROWS_PER_PAGE = 3
+
+
+def build_csv(source_csv: Path, rows: int, out_path: Path) -> None:
+    if source_csv.exists():
+        seed_df = pd.read_csv(source_csv)
+    else:
+        rng = np.random.default_rng(0)
+        seed_df = pd.DataFrame(
+            {
+                "Order ID": [f"US-{i:06d}" for i in range(10_000)],
+                "Category": rng.choice(["Furniture", "Office Supplies", "Technology"], 10_000),
+                "Sales": rng.gamma(2.0, 100.0, 10_000).round(2),
+                "Quantity": rng.integers(1, 10, 10_000),
+            }
+        )
+
+    # Write in tiles so building a 10M row file never holds 10M rows in memory.
+    header = True
+    written = 0
+    with open(out_path, "w", newline="") as f:
+        while written < rows:
+            tile = seed_df.iloc[: rows - written]
+            tile.to_csv(f, index=False, header=header)
+            header = False
+            written += len(tile)
+
+
+def time_page_flips(read_page, num_pages: int, flips: int) -> list[float]:
+    pages = [random.randint(1, num_pages) for _ in range(flips)]
+    timings = []
+    for page in pages:
+        start = time.perf_counter()
+        read_page(page)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summarize(timings: list[float]) -> dict:
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "max_ms": round(max(timings), 3),
+    }
+
+
+def run(rows: int, source_csv: Path, flips: int, baseline_flips: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = Path(tmp_dir) / "superstore.csv"
+        build_csv(source_csv, rows, csv_path)
+
+        start = time.perf_counter()
+        table = PagedTable.from_csv(csv_path)
+        convert_s = time.perf_counter() - start
+        num_pages = table.num_pages(ROWS_PER_PAGE)
+
+        def read_csv_page(page):
+            df = pd.read_csv(csv_path)
+            start_idx = (page - 1) * ROWS_PER_PAGE
+            return df.iloc[start_idx : start_idx + ROWS_PER_PAGE]
+
+        baseline = time_page_flips(read_csv_page, num_pages, baseline_flips)
+        paged = time_page_flips(lambda page: table.read_page(page, ROWS_PER_PAGE), num_pages, flips)
+
+        return {
+            "rows": rows,
+            "one_off_conversion_s": round(convert_s, 3),
+            "read_csv_per_flip": summarize(baseline),
+            "paged_table_per_flip": summarize(paged),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--csv", type=Path, default=Path("data/Superstore_2024.csv"))
+    parser.add_argument("--flips", type=int, default=200)
+    parser.add_argument("--baseline-flips", type=int, default=5, help="full re-reads are slow, keep this small")
+    args = parser.parse_args()
+
+    results = [run(rows, args.csv, args.flips, args.baseline_flips) for rows in args.rows]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
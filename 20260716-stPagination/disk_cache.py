@@ -0,0 +1,78 @@
+"""Small JSON cache on SQLite with per-read TTL and LRU eviction.
+
+Unlike ``st.cache_data`` it survives a server restart, and several Streamlit
+processes can share one file thanks to WAL mode.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterable
+
+
+class DiskCache:
+    def __init__(self, path: str | Path, max_entries: int = 50_000):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " stored_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)")
+
+    def get_many(self, keys: Iterable[str], ttl: float) -> dict[str, Any]:
+        """Return the entries younger than ``ttl`` seconds, marking them as recently used."""
+        keys = list(keys)
+        if not keys:
+            return {}
+        now = time.time()
+        placeholders = ",".join("?" * len(keys))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT key, value FROM cache WHERE key IN ({placeholders}) AND stored_at >= ?",
+                (*keys, now - ttl),
+            ).fetchall()
+            self._conn.executemany("UPDATE cache SET accessed_at = ? WHERE key = ?", [(now, key) for key, _ in rows])
+        return {key: json.loads(value) for key, value in rows}
+
+    def get(self, key: str, ttl: float) -> Any | None:
+        return self.get_many([key], ttl).get(key)
+
+    def put_many(self, entries: dict[str, Any]) -> None:
+        if not entries:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO cache (key, value, stored_at, accessed_at) VALUES (?, ?, ?, ?)",
+                [(key, json.dumps(value), now, now) for key, value in entries.items()],
+            )
+            self._evict()
+            self._conn.execute("COMMIT")
+
+    def put(self, key: str, value: Any) -> None:
+        self.put_many({key: value})
+
+    def _evict(self) -> None:
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed_at LIMIT ?)",
+                (overflow,),
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
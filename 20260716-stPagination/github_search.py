@@ -0,0 +1,146 @@
+"""GitHub issue search that coalesces identical requests and degrades to stale results.
+
+GitHub's search API allows a handful of requests per minute. This client
+caches result pages and each query's ``total_count`` separately, shares one
+HTTP call between every session asking for the same page, tracks the
+``X-RateLimit-*`` headers, and stops calling GitHub until the window resets,
+serving the last known results meanwhile.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import requests
+
+from inflight import InflightRequests
+
+
+class RateLimited(Exception):
+    """GitHub refused the search and there is no cached result to fall back on."""
+
+    def __init__(self, reset_at: float):
+        self.reset_at = reset_at
+        super().__init__(f"GitHub search rate limit exhausted, resets in {max(0, reset_at - time.time()):.0f}s")
+
+
+@dataclass(frozen=True)
+class SearchPage:
+    total_count: int
+    items: list[dict]
+    fetched_at: float
+    stale: bool = False
+
+
+class LRUCache:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        return None
+
+    def put(self, key, value) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace so 'foo  bar ' and 'foo bar' share one cache entry."""
+    return " ".join(query.split())
+
+
+class GitHubSearchClient:
+    def __init__(
+        self,
+        base_url: str,
+        repo: str,
+        page_ttl: float = 5 * 60,
+        count_ttl: float = 15 * 60,
+        max_entries: int = 1024,
+        max_workers: int = 4,
+        timeout: float = 10,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.repo = repo
+        self.page_ttl = page_ttl
+        self.count_ttl = count_ttl
+        self.timeout = timeout
+        self._pages = LRUCache(max_entries)
+        self._counts = LRUCache(max_entries)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="github-search")
+        self._inflight = InflightRequests()
+        self._rate_lock = threading.Lock()
+        self.rate_remaining: int | None = None
+        self.rate_reset_at = 0.0
+
+    def is_rate_limited(self) -> bool:
+        return self.rate_remaining == 0 and time.time() < self.rate_reset_at
+
+    def _update_rate_limit(self, response: requests.Response) -> None:
+        with self._rate_lock:
+            if "X-RateLimit-Remaining" in response.headers:
+                self.rate_remaining = int(response.headers["X-RateLimit-Remaining"])
+            if "X-RateLimit-Reset" in response.headers:
+                self.rate_reset_at = float(response.headers["X-RateLimit-Reset"])
+            if "Retry-After" in response.headers:
+                self.rate_remaining = 0
+                self.rate_reset_at = time.time() + float(response.headers["Retry-After"])
+
+    def _request(self, query: str, page: int, per_page: int) -> SearchPage:
+        response = requests.get(
+            f"{self.base_url}/search/issues",
+            params={"q": f"repo:{self.repo} {query}".strip(), "per_page": per_page, "page": page},
+            headers={"Accept": "application/vnd.github+json"},
+            timeout=self.timeout,
+        )
+        self._update_rate_limit(response)
+        if response.status_code in (403, 429) and self.is_rate_limited():
+            raise RateLimited(self.rate_reset_at)
+        response.raise_for_status()
+
+        payload = response.json()
+        result = SearchPage(payload["total_count"], payload["items"], time.time())
+        self._pages.put((query, page, per_page), result)
+        self._counts.put(query, (result.fetched_at, result.total_count))
+        return result
+
+    def search(self, query: str, page: int, per_page: int) -> SearchPage:
+        """Return one page of results: fresh from cache, fetched, or stale if GitHub refuses."""
+        query = normalize_query(query)
+        cached = self._pages.get((query, page, per_page))
+        if cached and time.time() - cached.fetched_at < self.page_ttl:
+            return cached
+
+        try:
+            if self.is_rate_limited():
+                raise RateLimited(self.rate_reset_at)
+            key = (query, page, per_page)
+            return self._inflight.submit(self._executor, key, self._request, query, page, per_page).result()
+        except (RateLimited, requests.RequestException):
+            if cached:
+                return SearchPage(cached.total_count, cached.items, cached.fetched_at, stale=True)
+            raise
+
+    def total_count(self, query: str, per_page: int) -> int:
+        """Number of results for ``query``, which outlives any single cached page."""
+        query = normalize_query(query)
+        cached = self._counts.get(query)
+        if cached and time.time() - cached[0] < self.count_ttl:
+            return cached[1]
+        try:
+            return self.search(query, 1, per_page).total_count
+        except (RateLimited, requests.RequestException):
+            if cached:
+                return cached[1]
+            raise
@@ -0,0 +1,58 @@
+"""Batched Hacker News item fetcher backed by a thread pool and a disk cache."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from disk_cache import DiskCache
+from inflight import InflightRequests
+
+ITEM_TTL_SECONDS = 60 * 60
+TOP_STORIES_TTL_SECONDS = 5 * 60
+
+
+class HNClient:
+    def __init__(self, base_url: str, cache: DiskCache, max_workers: int = 16, timeout: float = 10):
+        self.base_url = base_url.rstrip("/")
+        self.cache = cache
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hn-fetch")
+        self._inflight = InflightRequests()
+        self._local = threading.local()
+
+    def _get_json(self, path: str):
+        # One requests.Session per worker thread to reuse its keep-alive pool.
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+        response = self._local.session.get(f"{self.base_url}/{path}", timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def _fetch_item(self, item_id: int) -> dict:
+        # The API answers `null` for ids that no longer exist.
+        return self._get_json(f"item/{item_id}.json") or {"id": item_id, "deleted": True}
+
+    def top_story_ids(self, limit: int = 15) -> list[int]:
+        story_ids = self.cache.get("topstories", ttl=TOP_STORIES_TTL_SECONDS)
+        if story_ids is None:
+            story_ids = self._inflight.submit(self._executor, "topstories", self._get_json, "topstories.json").result()
+            self.cache.put("topstories", story_ids)
+        return story_ids[:limit]
+
+    def fetch_items(self, item_ids: list[int]) -> list[dict]:
+        """Return items in the order of ``item_ids``, fetching every cache miss concurrently."""
+        cached = self.cache.get_many((f"item/{item_id}" for item_id in item_ids), ttl=ITEM_TTL_SECONDS)
+        futures = {
+            item_id: self._inflight.submit(self._executor, ("item", item_id), self._fetch_item, item_id)
+            for item_id in item_ids
+            if f"item/{item_id}" not in cached
+        }
+        fetched = {f"item/{item_id}": future.result() for item_id, future in futures.items()}
+        # One transaction for the whole page rather than one per item.
+        self.cache.put_many(fetched)
+        items = {**cached, **fetched}
+        return [items[f"item/{item_id}"] for item_id in item_ids]
+
+    def fetch_item(self, item_id: int) -> dict:
+        return self.fetch_items([item_id])[0]
@@ -0,0 +1,119 @@
+"""Download each Picsum image once, keep resized variants on disk and serve them over HTTP.
+
+Variants are immutable for a given (id, size), so the proxy answers with a
+one-year ``Cache-Control`` and browsers stop re-downloading the same photo on
+every page flip.
+"""
+
+import io
+import os
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+from PIL import Image
+
+from inflight import InflightRequests
+
+VARIANTS = {
+    "thumb": (600, 400),
+    "full": (1200, 800),
+}
+SOURCE_SIZE = VARIANTS["full"]
+JPEG_QUALITY = 80
+
+
+class ImageCache:
+    def __init__(self, source_url: str, cache_dir: str | Path, max_workers: int = 8):
+        self.source_url = source_url.rstrip("/")
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="image-fetch")
+        self._inflight = InflightRequests()
+
+    def path_for(self, image_id: int, variant: str) -> Path:
+        width, height = VARIANTS[variant]
+        return self.cache_dir / f"{image_id}_{width}x{height}.jpg"
+
+    def _is_cached(self, image_id: int) -> bool:
+        return all(self.path_for(image_id, variant).exists() for variant in VARIANTS)
+
+    def _download(self, image_id: int) -> None:
+        if self._is_cached(image_id):
+            return
+        width, height = SOURCE_SIZE
+        response = requests.get(f"{self.source_url}/id/{image_id}/{width}/{height}", timeout=10)
+        response.raise_for_status()
+
+        source = Image.open(io.BytesIO(response.content)).convert("RGB")
+        for variant, size in VARIANTS.items():
+            buffer = io.BytesIO()
+            source.resize(size, Image.Resampling.LANCZOS).save(
+                buffer, format="JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True
+            )
+            # Write then rename, so the proxy never serves a half-written file.
+            path = self.path_for(image_id, variant)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_bytes(buffer.getvalue())
+            os.replace(tmp_path, path)
+
+    def warm(self, image_ids: list[int]) -> list[Future]:
+        """Download the images that are not on disk yet, concurrently."""
+        return [
+            self._inflight.submit(self._executor, image_id, self._download, image_id)
+            for image_id in image_ids
+            if not self._is_cached(image_id)
+        ]
+
+    def get(self, image_id: int, variant: str) -> bytes:
+        for future in self.warm([image_id]):
+            future.result()
+        return self.path_for(image_id, variant).read_bytes()
+
+
+class ImageProxyHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        match = re.fullmatch(r"/img/(\d+)/(\w+)\.jpg", self.path)
+        if not match or match.group(2) not in VARIANTS:
+            self.send_error(404)
+            return
+
+        image_id, variant = int(match.group(1)), match.group(2)
+        etag = f'"{image_id}-{variant}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        try:
+            body = self.server.image_cache.get(image_id, variant)
+        except requests.HTTPError:
+            self.send_error(404, "Image does not exist")
+            return
+        except requests.RequestException:
+            # Timeouts and connection errors reaching the image source
+            self.send_error(502, "Image source unavailable")
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "public, max-age=31536000, immutable")
+        self.send_header("ETag", etag)
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_image_proxy(image_cache: ImageCache, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Serve ``image_cache`` at ``/img/{id}/{variant}.jpg`` from a daemon thread."""
+    server = ThreadingHTTPServer((host, port), ImageProxyHandler)
+    server.image_cache = image_cache
+    threading.Thread(target=server.serve_forever, name="image-proxy", daemon=True).start()
+    return server
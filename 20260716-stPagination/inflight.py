@@ -0,0 +1,38 @@
+"""Share one running request between every caller that asks for the same key."""
+
+import threading
+from concurrent.futures import Executor, Future
+from typing import Callable, Hashable
+
+
+class InflightRequests:
+    """Registry of running futures keyed by request.
+
+    Lives in ``st.cache_resource`` so that two sessions opening the same page
+    at the same time wait on one HTTP call instead of issuing two.
+    """
+
+    def __init__(self):
+        # Reentrant: a future that finishes before add_done_callback runs its
+        # callback immediately, while submit still holds the lock.
+        self._lock = threading.RLock()
+        self._futures: dict[Hashable, Future] = {}
+
+    def submit(self, executor: Executor, key: Hashable, fn: Callable, *args) -> Future:
+        with self._lock:
+            future = self._futures.get(key)
+            if future is None:
+                future = executor.submit(fn, *args)
+                self._futures[key] = future
+                future.add_done_callback(lambda _, key=key: self._forget(key))
+            return future
+
+    def _forget(self, key: Hashable) -> None:
+        with self._lock:
+            self._futures.pop(key, None)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._futures
+
+    def __len__(self) -> int:
+        return len(self._futures)
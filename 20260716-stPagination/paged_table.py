@@ -0,0 +1,134 @@
+"""Serve pages of a large CSV without re-reading it.
+
+The CSV is converted once into an Arrow IPC file made of record batches, next
+to a small index holding the cumulative row offset of every batch. A page read
+memory-maps the file, bisects the offsets to find the one or two batches that
+hold the requested rows and only touches those, so page-flip latency stays
+flat however many rows the file has.
+
+Column types are inferred from the first TYPE_SAMPLE_BYTES of the CSV. A
+column holding a value of another type further down, like postal codes that
+are numbers until the first Canadian one, is converted again as text.
+"""
+
+import json
+import logging
+import os
+import re
+from bisect import bisect_right
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.ipc as ipc
+
+logger = logging.getLogger(__name__)
+
+BATCH_ROWS = 64 * 1024
+TYPE_SAMPLE_BYTES = 16 * 2**20
+
+# Where pyarrow's CSV reader reports the column a value could not be converted in
+_CONVERSION_ERROR_COLUMN = re.compile(r"In CSV column #(\d+)")
+
+
+def offsets_path_for(arrow_path: Path) -> Path:
+    return arrow_path.with_suffix(".offsets.json")
+
+
+def infer_column_types(csv_path: str | Path, sample_bytes: int = TYPE_SAMPLE_BYTES) -> dict[str, pa.DataType]:
+    """Column types of ``csv_path`` as pyarrow infers them from its first ``sample_bytes``."""
+    # The reader infers types from its first block only, a sample that large is that block
+    reader = pa_csv.open_csv(csv_path, read_options=pa_csv.ReadOptions(block_size=sample_bytes))
+    return dict(zip(reader.schema.names, reader.schema.types))
+
+
+def _write_batches(csv_path: Path, arrow_path: Path, column_types: dict, batch_rows: int) -> list[int]:
+    reader = pa_csv.open_csv(csv_path, convert_options=pa_csv.ConvertOptions(column_types=column_types))
+    offsets = [0]
+    with pa.OSFile(str(arrow_path), "wb") as sink, ipc.new_file(sink, reader.schema) as writer:
+        for batch in reader:
+            for start in range(0, batch.num_rows, batch_rows):
+                chunk = batch.slice(start, batch_rows)
+                writer.write_batch(chunk)
+                offsets.append(offsets[-1] + chunk.num_rows)
+    return offsets
+
+
+def convert_csv_to_arrow(csv_path: str | Path, arrow_path: str | Path, batch_rows: int = BATCH_ROWS) -> Path:
+    """Stream ``csv_path`` into an Arrow IPC file of at most ``batch_rows`` rows per batch."""
+    csv_path, arrow_path = Path(csv_path), Path(arrow_path)
+    offsets_path = offsets_path_for(arrow_path)
+    tmp_arrow_path = arrow_path.with_suffix(".arrow.tmp")
+    tmp_offsets_path = offsets_path.with_suffix(".json.tmp")
+
+    column_types = infer_column_types(csv_path)
+    while True:
+        try:
+            offsets = _write_batches(csv_path, tmp_arrow_path, column_types, batch_rows)
+            break
+        except pa.ArrowInvalid as e:
+            match = _CONVERSION_ERROR_COLUMN.search(str(e))
+            if match is None:
+                raise
+            column = list(column_types)[int(match.group(1))]
+            if column_types[column] == pa.string():
+                raise
+            logger.warning("Converting %s again with column %r as text: %s", csv_path, column, e)
+            column_types[column] = pa.string()
+    tmp_offsets_path.write_text(json.dumps(offsets))
+
+    # Index last, so a reader never sees an index newer than its data file.
+    os.replace(tmp_arrow_path, arrow_path)
+    os.replace(tmp_offsets_path, offsets_path)
+    return arrow_path
+
+
+class PagedTable:
+    """Random-access row ranges over a memory-mapped Arrow IPC file."""
+
+    def __init__(self, arrow_path: str | Path):
+        self.path = Path(arrow_path)
+        self._source = pa.memory_map(str(self.path), "r")
+        self._reader = ipc.open_file(self._source)
+        self._offsets = json.loads(offsets_path_for(self.path).read_text())
+
+    @classmethod
+    def from_csv(cls, csv_path: str | Path, arrow_path: str | Path | None = None) -> "PagedTable":
+        """Open the Arrow copy of ``csv_path``, converting it first if missing or stale."""
+        csv_path = Path(csv_path)
+        arrow_path = Path(arrow_path) if arrow_path else csv_path.with_suffix(".arrow")
+        offsets_path = offsets_path_for(arrow_path)
+        if not offsets_path.exists() or offsets_path.stat().st_mtime < csv_path.stat().st_mtime:
+            convert_csv_to_arrow(csv_path, arrow_path)
+        return cls(arrow_path)
+
+    @property
+    def num_rows(self) -> int:
+        return self._offsets[-1]
+
+    @property
+    def columns(self) -> list[str]:
+        return self._reader.schema.names
+
+    def num_pages(self, rows_per_page: int) -> int:
+        return max(1, -(-self.num_rows // rows_per_page))
+
+    def read_rows(self, start: int, stop: int) -> pd.DataFrame:
+        """Return rows ``[start, stop)`` as a dataframe, reading only the batches that hold them."""
+        start = max(0, min(start, self.num_rows))
+        stop = max(start, min(stop, self.num_rows))
+
+        first_batch = bisect_right(self._offsets, start) - 1
+        batches = []
+        batch_index = first_batch
+        while batch_index < self._reader.num_record_batches and self._offsets[batch_index] < stop:
+            batches.append(self._reader.get_batch(batch_index))
+            batch_index += 1
+
+        table = pa.Table.from_batches(batches, schema=self._reader.schema)
+        return table.slice(start - self._offsets[first_batch], stop - start).to_pandas()
+
+    def read_page(self, page: int, rows_per_page: int) -> pd.DataFrame:
+        start = (page - 1) * rows_per_page
+        return self.read_rows(start, start + rows_per_page)
@@ -0,0 +1,91 @@
+"""Discover Picsum's valid image ids page by page, without blocking the first render.
+
+The first `/v2/list` page is fetched synchronously, the rest on a background
+thread. Every page is appended to a file of packed unsigned ints, so a
+restarted server resumes from disk instead of crawling again.
+"""
+
+import logging
+import threading
+from array import array
+from pathlib import Path
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 100
+
+
+class PicsumIdSource:
+    def __init__(self, base_url: str, path: str | Path, page_size: int = PAGE_SIZE):
+        self.base_url = base_url.rstrip("/")
+        self.path = Path(path)
+        self.page_size = page_size
+        # Reentrant: start() holds it across the first page, which _append takes again
+        self._lock = threading.RLock()
+        self._ids = array("I")
+        self._crawler: threading.Thread | None = None
+
+        if self.path.exists():
+            self._ids.frombytes(self.path.read_bytes())
+        # Only whole pages are ever persisted, so the crawl resumes right after them
+        self._next_page = len(self._ids) // self.page_size + 1
+        self.complete = self._complete_marker.exists()
+
+    @property
+    def _complete_marker(self) -> Path:
+        return self.path.with_suffix(".complete")
+
+    def _fetch_page(self, page: int) -> list[int]:
+        response = requests.get(
+            f"{self.base_url}/v2/list", params={"page": page, "limit": self.page_size}, timeout=10
+        )
+        response.raise_for_status()
+        return [int(item["id"]) for item in response.json()]
+
+    def _append(self, page: int, batch: list[int]) -> None:
+        """Persist `page` if it is the next one, a short page completes the crawl."""
+        chunk = array("I", batch)
+        with self._lock:
+            if page != self._next_page or self.complete:
+                return
+            if chunk:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "ab") as f:
+                    chunk.tofile(f)
+                self._ids.extend(chunk)
+            self._next_page += 1
+            if len(chunk) < self.page_size:
+                self._complete_marker.touch()
+                self.complete = True
+
+    def _fetch_next(self) -> None:
+        with self._lock:
+            page = self._next_page
+        self._append(page, self._fetch_page(page))
+
+    def _crawl(self) -> None:
+        try:
+            while not self.complete:
+                self._fetch_next()
+        except requests.RequestException:
+            logger.exception("Picsum id crawl stopped, it resumes on the next start()")
+
+    def start(self) -> None:
+        """Make sure at least one page of ids is known and crawl the rest in the background."""
+        # Checked and spawned under the lock, concurrent sessions share a single crawler
+        with self._lock:
+            if self.complete or (self._crawler and self._crawler.is_alive()):
+                return
+            if not self._ids:
+                self._fetch_next()
+                if self.complete:
+                    return
+            self._crawler = threading.Thread(target=self._crawl, name="picsum-id-crawler", daemon=True)
+            self._crawler.start()
+
+    def ids(self) -> array:
+        """Snapshot of the ids discovered so far."""
+        with self._lock:
+            return array("I", self._ids)
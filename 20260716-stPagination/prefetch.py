@@ -0,0 +1,98 @@
+"""Warm the pages around the one being viewed so the next page flip is a cache hit."""
+
+from collections.abc import Callable, Hashable
+from concurrent.futures import Executor, Future
+from typing import Any
+
+
+class PagePrefetcher:
+    """Page results of one paginated view, keyed by page number.
+
+    One instance lives in each session's ``st.session_state`` and submits its
+    loads to an executor shared by the whole process. ``scope`` identifies
+    what is being paginated (a story id, a search query...): changing it drops
+    every page of the previous scope and cancels its pending loads.
+    """
+
+    def __init__(self, executor: Executor, radius: int = 1, max_pages: int = 16):
+        self.executor = executor
+        self.radius = radius
+        self.max_pages = max_pages
+        self.hits = 0
+        self.misses = 0
+        self.cancelled = 0
+        self._scope: Hashable = None
+        self._pages: dict[int, Future] = {}
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def _set_scope(self, scope: Hashable) -> None:
+        if scope != self._scope:
+            self._cancel(list(self._pages))
+            self._pages.clear()
+            self._scope = scope
+
+    def _cancel(self, pages: list[int]) -> None:
+        for page in pages:
+            future = self._pages.pop(page)
+            if future.cancel():
+                self.cancelled += 1
+
+    def get(self, scope: Hashable, page: int, load: Callable[[int], Any]) -> Any:
+        """Return ``load(page)``, from the prefetched result when there is one.
+
+        A prefetch already running counts as a hit: waiting on it is never
+        slower than starting the same load from scratch. One still queued, maybe
+        behind other sessions' prefetches in the shared executor, is cancelled
+        and loaded here instead, as a miss.
+        """
+        self._set_scope(scope)
+        future = self._pages.get(page)
+        if future is not None and future.cancel():
+            self.cancelled += 1
+            future = None
+        if future is not None:
+            try:
+                result = future.result()
+            except Exception:
+                pass  # a failed prefetch is retried below, on the script thread
+            else:
+                self.hits += 1
+                return result
+
+        self.misses += 1
+        result = load(page)
+        self._pages[page] = future = Future()
+        future.set_result(result)
+        return result
+
+    def warm(self, scope: Hashable, page: int, num_pages: int, load: Callable[[int], Any]) -> None:
+        """Prefetch pages within ``radius`` of ``page`` and cancel pending loads that fell out of it."""
+        self._set_scope(scope)
+        window = range(max(1, page - self.radius), min(num_pages, page + self.radius) + 1)
+
+        # A page jump leaves queued loads for the old neighbourhood behind:
+        # cancel those that have not started yet. Finished pages stay cached.
+        self._cancel([p for p, future in self._pages.items() if p not in window and not future.done()])
+
+        for neighbour in window:
+            if neighbour not in self._pages:
+                self._pages[neighbour] = self.executor.submit(load, neighbour)
+
+        # Evict the finished pages farthest from the current one.
+        done_pages = sorted((p for p, future in self._pages.items() if future.done()), key=lambda p: abs(p - page))
+        for stale in done_pages[self.max_pages :]:
+            if stale not in window:
+                del self._pages[stale]
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 3),
+            "cancelled": self.cancelled,
+            "pending": sum(not future.done() for future in self._pages.values()),
+        }
@@ -0,0 +1,131 @@
+"""Durable review labels shared by every annotator, written behind the script thread.
+
+``record`` only queues the label: a writer thread commits queued labels in
+batches to SQLite in WAL mode, so readers never wait on a write and a rerun
+never waits on a commit. Labels still in the queue are overlaid on reads, so
+a reviewer sees their own click immediately.
+"""
+
+import itertools
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class ReviewStore:
+    def __init__(self, path: str | Path, batch_size: int = 256, flush_interval: float = 0.2):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._read_lock = threading.Lock()
+        self._read_conn = self._connect()
+        # The (task, sample_id) primary key doubles as the index answering
+        # "which samples of this task are reviewed".
+        self._read_conn.execute(
+            "CREATE TABLE IF NOT EXISTS reviews ("
+            " task TEXT NOT NULL,"
+            " sample_id TEXT NOT NULL,"
+            " label TEXT NOT NULL,"
+            " reviewer TEXT,"
+            " reviewed_at REAL NOT NULL,"
+            " PRIMARY KEY (task, sample_id)"
+            ") WITHOUT ROWID"
+        )
+
+        self._queue: queue.Queue = queue.Queue()
+        self._pending_lock = threading.Lock()
+        self._pending: dict[tuple[str, str], tuple[int, str]] = {}
+        self._sequence = itertools.count()
+        self._writer = threading.Thread(target=self._write_loop, name="review-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def record(self, task: str, sample_id: str, label: str, reviewer: str | None = None) -> None:
+        """Queue a label for ``sample_id``. Returns without touching the database."""
+        key = (task, str(sample_id))
+        with self._pending_lock:
+            sequence = next(self._sequence)
+            self._pending[key] = (sequence, str(label))
+        self._queue.put((sequence, key, str(label), reviewer, time.time()))
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        batch = []
+        while True:
+            # A batch that failed to commit is retried as is before anything queued after
+            # it, so it never overwrites a newer label for the same sample.
+            if not batch:
+                batch = [self._queue.get()]
+                # Give concurrent reviewers a moment to add to the same commit.
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size and (timeout := deadline - time.monotonic()) > 0:
+                    try:
+                        batch.append(self._queue.get(timeout=timeout))
+                    except queue.Empty:
+                        break
+
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.executemany(
+                    "INSERT INTO reviews (task, sample_id, label, reviewer, reviewed_at) VALUES (?, ?, ?, ?, ?)"
+                    " ON CONFLICT (task, sample_id) DO UPDATE SET"
+                    " label = excluded.label, reviewer = excluded.reviewer, reviewed_at = excluded.reviewed_at",
+                    [(task, sample_id, label, reviewer, reviewed_at) for _, (task, sample_id), label, reviewer, reviewed_at in batch],
+                )
+                conn.execute("COMMIT")
+            except sqlite3.Error:
+                logger.exception("Could not commit %d review(s), they stay pending and are retried", len(batch))
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                time.sleep(1)
+                continue
+
+            with self._pending_lock:
+                for sequence, key, *_ in batch:
+                    # A newer label for the same sample may have been queued meanwhile.
+                    if self._pending.get(key, (None,))[0] == sequence:
+                        del self._pending[key]
+            for _ in batch:
+                self._queue.task_done()
+            batch = []
+
+    def flush(self) -> None:
+        """Block until every queued label is committed."""
+        self._queue.join()
+
+    def reviewed(self, task: str) -> dict[str, str]:
+        """Labels of every reviewed sample of ``task``, committed or still queued."""
+        with self._read_lock:
+            rows = self._read_conn.execute("SELECT sample_id, label FROM reviews WHERE task = ?", (task,)).fetchall()
+        labels = dict(rows)
+        with self._pending_lock:
+            labels.update({sample_id: label for (t, sample_id), (_, label) in self._pending.items() if t == task})
+        return labels
+
+    def label(self, task: str, sample_id: str) -> str | None:
+        key = (task, str(sample_id))
+        with self._pending_lock:
+            if key in self._pending:
+                return self._pending[key][1]
+        with self._read_lock:
+            row = self._read_conn.execute(
+                "SELECT label FROM reviews WHERE task = ? AND sample_id = ?", key
+            ).fetchone()
+        return row[0] if row else None
+
+    def remaining(self, task: str, sample_ids: list[str]) -> list[str]:
+        """``sample_ids`` that have no label yet, in their original order."""
+        reviewed = self.reviewed(task)
+        return [sample_id for sample_id in sample_ids if str(sample_id) not in reviewed]
@@ -1,31 +1,76 @@
 import html
-import io
+import os
 import re
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 
+import numpy as np
 import pandas as pd
-import requests
-import soundfile as sf
 import streamlit as st
 from datasets import Audio, load_dataset
 from sklearn.datasets import load_digits
 from sklearn.linear_model import LogisticRegression
 from sklearn.model_selection import train_test_split
 
+from audio_pipeline import ClipPipeline
+from disk_cache import DiskCache
+from github_search import GitHubSearchClient, RateLimited, SearchPage
+from hn_client import TOP_STORIES_TTL_SECONDS, HNClient
+from image_proxy import ImageCache, start_image_proxy
+from paged_table import PagedTable
+from picsum_ids import PicsumIdSource
+from prefetch import PagePrefetcher
+from review_store import ReviewStore
+
 st.set_page_config(page_title="Pagination Demos", layout="wide")
 
 st.html("<style>.stMainBlockContainer { padding-top: 3rem; }</style>")
 
 
+# ---------------------------------------------------------------------------
+# Prefetching
+# ---------------------------------------------------------------------------
+# Once page N renders, pages N-1 and N+1 load in the background so the next
+# flip renders from memory. Loaders run off the script thread, so they must
+# not call any st.* command.
+PREFETCH_RADIUS = 1
+PREFETCH_WORKERS = 8
+
+
+@st.cache_resource
+def get_prefetch_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="prefetch")
+
+
+def get_prefetcher(name: str) -> PagePrefetcher:
+    prefetchers = st.session_state.setdefault("prefetchers", {})
+    if name not in prefetchers:
+        prefetchers[name] = PagePrefetcher(get_prefetch_executor(), radius=PREFETCH_RADIUS)
+    return prefetchers[name]
+
+
 # ---------------------------------------------------------------------------
 # Dataframe pagination
 # ---------------------------------------------------------------------------
+SUPERSTORE_CSV = "data/Superstore_2024.csv"
+
+
+# Keyed on the CSV's mtime so editing the file converts it again instead of
+# serving pages from a stale Arrow copy.
+@st.cache_resource(show_spinner="Converting Superstore data to Arrow...")
+def open_superstore_table(csv_mtime: float) -> PagedTable:
+    return PagedTable.from_csv(SUPERSTORE_CSV)
+
+
 def dataframe_demo():
     st.title("Paginate a Dataframe")
     st.caption("Superstore 2024 sales data, sliced into pages of rows with `st.pagination`.")
 
-    df = pd.read_csv("data/Superstore_2024.csv")
+    table = open_superstore_table(os.path.getmtime(SUPERSTORE_CSV))
     rows_per_page = 3
-    total_pages = (len(df) + rows_per_page - 1) // rows_per_page
+    total_pages = table.num_pages(rows_per_page)
 
     # Use placeholders to show dataframe above pagination
     dataframe_slot = st.empty()
@@ -36,15 +81,15 @@ def dataframe_demo():
         key="selected_page",
     )
 
-    start_idx = (page - 1) * rows_per_page
-    end_idx = start_idx + rows_per_page
-    dataframe_slot.dataframe(df.iloc[start_idx:end_idx], hide_index=True)
+    dataframe_slot.dataframe(table.read_page(page, rows_per_page), hide_index=True)
 
 
 # ---------------------------------------------------------------------------
 # API results
 # ---------------------------------------------------------------------------
-HN_API_URL = "https://hacker-news.firebaseio.com/v0"
+# Point at stubs/fake_hn_server.py to develop and benchmark offline.
+HN_API_URL = os.environ.get("HN_API_URL", "https://hacker-news.firebaseio.com/v0")
+HN_CACHE_PATH = "data/hn_cache.sqlite"
 COMMENTS_PER_PAGE = 3
 
 
@@ -53,19 +98,18 @@ def clean_hn_comment_text(raw_html: str) -> str:
     return html.unescape(text).strip()
 
 
-@st.cache_data(show_spinner=False)
-def fetch_hn_item(item_id: int) -> dict:
-    response = requests.get(f"{HN_API_URL}/item/{item_id}.json", timeout=10)
-    response.raise_for_status()
-    return response.json()
+# One client per process: its thread pool, in-flight request registry and
+# disk cache are shared by every session, so concurrent sessions never fetch
+# the same item twice and a restarted server starts warm.
+@st.cache_resource
+def get_hn_client() -> HNClient:
+    return HNClient(HN_API_URL, DiskCache(HN_CACHE_PATH))
 
 
-@st.cache_data(show_spinner="Fetching top stories from Hacker News...")
+@st.cache_data(ttl=TOP_STORIES_TTL_SECONDS, show_spinner="Fetching top stories from Hacker News...")
 def fetch_top_stories(limit: int = 15) -> list[dict]:
-    response = requests.get(f"{HN_API_URL}/topstories.json", timeout=10)
-    response.raise_for_status()
-    story_ids = response.json()[:limit]
-    return [fetch_hn_item(story_id) for story_id in story_ids]
+    client = get_hn_client()
+    return client.fetch_items(client.top_story_ids(limit))
 
 
 def api_results_demo():
@@ -90,23 +134,35 @@ def api_results_demo():
         # reusing a page number that may be out of range for the new story.
         page = st.pagination(num_pages=total_pages, key=f"api_page_{story['id']}")
 
-    start = (page - 1) * COMMENTS_PER_PAGE
-    page_comment_ids = comment_ids[start : start + COMMENTS_PER_PAGE]
+    def load_comments(page: int) -> list[dict]:
+        start = (page - 1) * COMMENTS_PER_PAGE
+        return get_hn_client().fetch_items(comment_ids[start : start + COMMENTS_PER_PAGE])
+
+    prefetcher = get_prefetcher("api_comments")
+    page_comments = prefetcher.get(story["id"], page, load_comments)
     with results_slot.container():
-        if not page_comment_ids:
+        if not page_comments:
             st.info("This story has no comments yet.")
-        for comment_id in page_comment_ids:
-            comment = fetch_hn_item(comment_id)
+        for comment in page_comments:
             author = comment.get("by", "[deleted]")
             text = clean_hn_comment_text(comment.get("text", "*[deleted]*"))
             with st.chat_message(name="user"):
                 st.markdown(f"**{author}**")
                 st.write(text)
+    prefetcher.warm(story["id"], page, total_pages, load_comments)
 
 
 # ---------------------------------------------------------------------------
 # Image gallery
 # ---------------------------------------------------------------------------
+PICSUM_URL = os.environ.get("PICSUM_URL", "https://picsum.photos")
+PICSUM_IDS_PATH = "data/picsum_ids.u32"
+IMAGE_CACHE_DIR = "data/image_cache"
+# Image bytes go through Streamlit unless IMAGE_PROXY_URL is set: the browser
+# then loads gallery images from that address, which must reach the proxy
+# listening on 127.0.0.1:IMAGE_PROXY_PORT (e.g. through a reverse proxy).
+IMAGE_PROXY_PORT = int(os.environ.get("IMAGE_PROXY_PORT", "8599"))
+IMAGE_PROXY_URL = os.environ.get("IMAGE_PROXY_URL")
 IMAGES_PER_PAGE = 6
 TOTAL_IMAGES = 60
 # Picsum's low ids (0-5ish) happen to all be laptop/desk photos, and not
@@ -116,19 +172,29 @@ TOTAL_IMAGES = 60
 PICSUM_ID_SEED = 37
 
 
-@st.cache_data(show_spinner=False)
-def fetch_picsum_ids() -> list[int]:
-    ids = []
-    page = 1
-    while True:
-        response = requests.get("https://picsum.photos/v2/list", params={"page": page, "limit": 100}, timeout=10)
-        response.raise_for_status()
-        batch = response.json()
-        if not batch:
-            break
-        ids.extend(int(item["id"]) for item in batch)
-        page += 1
-    return ids
+# Returns after a single /v2/list round trip, later pages are discovered in
+# the background and persisted to PICSUM_IDS_PATH for the next cold start.
+@st.cache_resource(show_spinner=False)
+def get_picsum_id_source() -> PicsumIdSource:
+    return PicsumIdSource(PICSUM_URL, PICSUM_IDS_PATH)
+
+
+@st.cache_resource
+def get_image_cache() -> ImageCache:
+    return ImageCache(PICSUM_URL, IMAGE_CACHE_DIR)
+
+
+@st.cache_resource
+def get_image_proxy_url() -> str | None:
+    if not IMAGE_PROXY_URL or not IMAGE_PROXY_PORT:
+        return None
+    try:
+        # Loopback only, the proxy fetches and resizes any id it is asked for
+        start_image_proxy(get_image_cache(), host="127.0.0.1", port=IMAGE_PROXY_PORT)
+    except OSError:
+        # Port taken, most likely by another app process: fall back to bytes.
+        return None
+    return IMAGE_PROXY_URL
 
 
 def image_gallery_demo():
@@ -140,14 +206,56 @@ def image_gallery_demo():
     with st.container(horizontal_alignment="right"):
         page = st.pagination(num_pages=total_pages, key="gallery_page")
 
-    valid_ids = fetch_picsum_ids()
-    start_index = (page - 1) * IMAGES_PER_PAGE
+    id_source = get_picsum_id_source()
+    # Restarts the crawl if a network error stopped it, no-op otherwise.
+    id_source.start()
+    valid_ids = id_source.ids()
+
+    image_cache = get_image_cache()
+    proxy_url = get_image_proxy_url()
+
+    # Images are downloaded and resized server-side, so a prefetched page is
+    # already on disk when the browser asks the proxy for it.
+    def load_images(page: int) -> list[int]:
+        start_index = (page - 1) * IMAGES_PER_PAGE
+        image_ids = [
+            valid_ids[(index * PICSUM_ID_SEED) % len(valid_ids)]
+            for index in range(start_index, start_index + IMAGES_PER_PAGE)
+        ]
+        for future in image_cache.warm(image_ids):
+            future.result()
+        return image_ids
+
+    # Ids scatter modulo the number discovered so far: scope prefetched pages
+    # by that count so they are recomputed as the crawl discovers more.
+    prefetcher = get_prefetcher("gallery")
     with gallery_slot.container():
         cols = st.columns(3)
-        for offset, index in enumerate(range(start_index, start_index + IMAGES_PER_PAGE)):
-            image_id = valid_ids[(index * PICSUM_ID_SEED) % len(valid_ids)]
+        for offset, image_id in enumerate(prefetcher.get(len(valid_ids), page, load_images)):
             with cols[offset % 3]:
-                st.image(f"https://picsum.photos/id/{image_id}/600/400", caption=f"Photo #{image_id}")
+                if proxy_url:
+                    st.image(f"{proxy_url}/img/{image_id}/thumb.jpg")
+                    st.caption(f"[Photo #{image_id}]({proxy_url}/img/{image_id}/full.jpg)")
+                else:
+                    st.image(image_cache.get(image_id, "thumb"), caption=f"Photo #{image_id}")
+    prefetcher.warm(len(valid_ids), page, total_pages, load_images)
+
+
+# ---------------------------------------------------------------------------
+# Review labels
+# ---------------------------------------------------------------------------
+# Digit and transcript reviews go to one SQLite file shared by every session,
+# so they survive restarts and annotators see each other's work.
+REVIEWS_PATH = "data/reviews.sqlite"
+
+
+@st.cache_resource
+def get_review_store() -> ReviewStore:
+    return ReviewStore(REVIEWS_PATH)
+
+
+def get_reviewer_id() -> str:
+    return st.session_state.setdefault("reviewer_id", uuid.uuid4().hex[:8])
 
 
 # ---------------------------------------------------------------------------
@@ -164,6 +272,43 @@ CHART_COLORS = {
 }
 
 
+REVIEW_QUEUES = ("Test set order", "Lowest confidence first", "Misclassified first")
+
+
+@dataclass(frozen=True)
+class DigitPredictions:
+    """Model outputs for the whole test set, scored once so each review page is a lookup."""
+
+    probabilities: np.ndarray  # (n_samples, n_classes) float32
+    top_classes: np.ndarray  # (n_samples, DIGITS_TOP_N_CLASSES) uint8, most likely first
+    confidence: np.ndarray  # (n_samples,) float32, probability of the predicted class
+    misclassified: np.ndarray  # (n_samples,) bool
+    queues: dict[str, np.ndarray]  # review queue name -> sample indices in review order
+
+    @property
+    def predicted(self) -> np.ndarray:
+        return self.top_classes[:, 0]
+
+
+def score_test_set(model, x_test, y_test) -> DigitPredictions:
+    probabilities = model.predict_proba(x_test).astype(np.float32)
+    # argpartition then a sort of the k survivors beats a full argsort per row.
+    top_unsorted = np.argpartition(-probabilities, DIGITS_TOP_N_CLASSES - 1, axis=1)[:, :DIGITS_TOP_N_CLASSES]
+    top_order = np.argsort(-np.take_along_axis(probabilities, top_unsorted, axis=1), axis=1, kind="stable")
+    top_classes = np.take_along_axis(top_unsorted, top_order, axis=1).astype(np.uint8)
+    confidence = np.take_along_axis(probabilities, top_classes[:, :1].astype(np.intp), axis=1)[:, 0]
+    misclassified = top_classes[:, 0] != np.asarray(y_test)
+
+    by_confidence = np.argsort(confidence, kind="stable")
+    queues = {
+        "Test set order": np.arange(len(confidence)),
+        "Lowest confidence first": by_confidence,
+        # lexsort sorts by its last key first: misclassified, then confidence.
+        "Misclassified first": np.lexsort((confidence, ~misclassified)),
+    }
+    return DigitPredictions(probabilities, top_classes, confidence, misclassified, queues)
+
+
 @st.cache_resource(show_spinner="Training a digit-recognition model...")
 def train_digit_classifier():
     digits = load_digits()
@@ -177,27 +322,23 @@ def train_digit_classifier():
     )
     model = LogisticRegression(max_iter=2000)
     model.fit(x_train, y_train)
-    return model, digits.images, x_test, y_test, list(test_indices)
+    predictions = score_test_set(model, x_test, y_test)
+    return model, digits.images, x_test, y_test, list(test_indices), predictions
 
 
-def build_confidence_chart_data(probabilities, theme: str) -> pd.DataFrame:
+def build_confidence_chart_data(probabilities, top_indices, theme: str) -> pd.DataFrame:
     colors = CHART_COLORS[theme]
-    top_indices = probabilities.argsort()[::-1][:DIGITS_TOP_N_CLASSES]
     top_probs = probabilities[top_indices] * 100
     bar_colors = [colors["accent"] if i == 0 else colors["context"] for i in range(len(top_indices))]
     return pd.DataFrame({"digit": [str(i) for i in top_indices], "confidence": top_probs, "color": bar_colors})
 
 
-def confirm_digit_prediction(sample_index: int) -> None:
-    confirmed = st.session_state.setdefault("confirmed_predictions", set())
-    confirmed.add(sample_index)
+def confirm_digit_prediction(sample_index: int, predicted_class: int) -> None:
+    get_review_store().record("digits", sample_index, predicted_class, get_reviewer_id())
 
 
 def submit_reviewed_digit(sample_index: int, review_key: str) -> None:
-    confirmed = st.session_state.setdefault("confirmed_predictions", set())
-    confirmed.add(sample_index)
-    reviewed = st.session_state.setdefault("reviewed_digits", {})
-    reviewed[sample_index] = st.session_state[review_key]
+    get_review_store().record("digits", sample_index, st.session_state[review_key], get_reviewer_id())
 
 
 def model_inference_demo():
@@ -208,26 +349,46 @@ def model_inference_demo():
         "top predicted classes with confidence, then confirm."
     )
 
-    model, images, x_test, y_test, test_indices = train_digit_classifier()
-    total_pages = len(y_test)
+    model, images, x_test, y_test, test_indices, predictions = train_digit_classifier()
+    review_store = get_review_store()
+    reviewed_digits = review_store.reviewed("digits")
+
+    options_row = st.container(horizontal=True, vertical_alignment="bottom")
+    queue_name = options_row.segmented_control("Review queue", REVIEW_QUEUES, default=REVIEW_QUEUES[0], required=True)
+    hide_reviewed = options_row.toggle("Hide reviewed digits")
+    st.caption(f"{len(y_test) - len(reviewed_digits)} of {len(y_test)} digits left to review.")
+
+    review_queue = predictions.queues[queue_name]
+    if hide_reviewed:
+        reviewed_mask = np.zeros(len(y_test), dtype=bool)
+        reviewed_mask[[int(sample_id) for sample_id in reviewed_digits]] = True
+        review_queue = review_queue[~reviewed_mask[review_queue]]
+    if len(review_queue) == 0:
+        st.success("Every digit has been reviewed.")
+        return
+    total_pages = len(review_queue)
     review_slot = st.empty()
-    page = st.container(horizontal_alignment="right").pagination(num_pages=total_pages, key="digits_page")
+    # Keyed per queue so switching queues starts again from its first sample.
+    page = st.container(horizontal_alignment="right").pagination(
+        num_pages=total_pages, key=f"digits_page_{queue_name}"
+    )
 
-    sample_index = page - 1
+    # Hiding reviewed digits shrinks the queue under the current page number.
+    sample_index = int(review_queue[min(page, total_pages) - 1])
     image_index = test_indices[sample_index]
-    probabilities = model.predict_proba([x_test[sample_index]])[0]
-    predicted_class = probabilities.argmax()
+    probabilities = predictions.probabilities[sample_index]
+    predicted_class = predictions.predicted[sample_index]
     true_class = y_test[sample_index]
 
-    theme = st.context.theme.type
-    confirmed = st.session_state.setdefault("confirmed_predictions", set())
+    # No browser reports a theme in headless runs (AppTest, benchmarks).
+    theme = st.context.theme.type or "light"
 
     review_container = review_slot.container()
 
     media_row = review_container.container(horizontal=True, vertical_alignment="center", gap="small")
     media_row.image(images[image_index] / 16.0, caption=f"True digit: {true_class}", width=150, clamp=True)
     media_row.bar_chart(
-        build_confidence_chart_data(probabilities, theme),
+        build_confidence_chart_data(probabilities, predictions.top_classes[sample_index], theme),
         x="digit",
         y="confidence",
         color="color",
@@ -249,7 +410,7 @@ def model_inference_demo():
         type="primary",
         width=150,
         on_click=confirm_digit_prediction,
-        args=(sample_index,),
+        args=(sample_index, int(predicted_class)),
     )
 
     review_form = action_row.form("review_form", border=False)
@@ -269,7 +430,7 @@ def model_inference_demo():
         args=(sample_index, review_key),
     )
 
-    if sample_index in confirmed:
+    if str(sample_index) in reviewed_digits:
         action_row.write("✅ Checked")
 
 
@@ -282,17 +443,25 @@ AUDIO_SPLIT = "validation"
 CLIPS_PER_PAGE = 1
 
 
-@st.cache_resource(show_spinner="Loading audio dataset into memory...")
+AUDIO_CACHED_CLIPS = 64
+AUDIO_LOOKAHEAD_CLIPS = 2 * CLIPS_PER_PAGE
+
+
+@st.cache_resource(show_spinner="Loading audio dataset...")
 def load_audio_dataset():
     dataset = load_dataset(AUDIO_DATASET, AUDIO_CONFIG, split=AUDIO_SPLIT)
-    # decode=False keeps raw bytes on the dataset object instead of eagerly
-    # decoding every clip; we decode per-clip with soundfile below.
+    # decode=False keeps raw bytes on the memory-mapped Arrow table instead of
+    # eagerly decoding every clip; ClipPipeline decodes per clip.
     return dataset.cast_column("audio", Audio(decode=False))
 
 
+@st.cache_resource
+def get_clip_pipeline() -> ClipPipeline:
+    return ClipPipeline(load_audio_dataset(), max_cached=AUDIO_CACHED_CLIPS, lookahead=AUDIO_LOOKAHEAD_CLIPS)
+
+
 def submit_transcript(sample_id: str, transcript_key: str, current_page: int, total_pages: int) -> None:
-    submitted = st.session_state.setdefault("submitted_transcripts", {})
-    submitted[sample_id] = st.session_state[transcript_key]
+    get_review_store().record("transcripts", sample_id, st.session_state[transcript_key], get_reviewer_id())
     if current_page < total_pages:
         st.session_state["audio_page"] = current_page + 1
 
@@ -301,61 +470,70 @@ def audio_review_demo():
     st.title("Paginate a Hugging Face Audio Dataset")
     st.caption(
         f"`{AUDIO_DATASET}` is downloaded once via the `datasets` library and "
-        "held in memory. Pagination then just slices the in-memory dataset."
+        "memory-mapped. Clips are decoded on demand, a couple ahead of the one "
+        "you are listening to."
     )
 
-    dataset = load_audio_dataset()
-    total_pages = -(-len(dataset) // CLIPS_PER_PAGE)
+    pipeline = get_clip_pipeline()
+    # Listed with the page prefetchers in the sidebar: its lookahead decodes
+    # are the audio page's prefetching.
+    st.session_state.setdefault("prefetchers", {})["audio_clips"] = pipeline
+    total_pages = -(-len(pipeline) // CLIPS_PER_PAGE)
+    # The original FLAC bytes are a fraction of the WAV that st.audio builds
+    # from float samples.
+    compressed = st.toggle("Send compressed audio", value=True)
     clips_slot = st.empty()
     page = st.container(horizontal_alignment="right").pagination(num_pages=total_pages, key="audio_page")
 
     start = (page - 1) * CLIPS_PER_PAGE
     clips_container = clips_slot.container()
-    for i in range(start, min(start + CLIPS_PER_PAGE, len(dataset))):
-        sample = dataset[i]
-        audio_data, sample_rate = sf.read(io.BytesIO(sample["audio"]["bytes"]))
-        clips_container.write(f"**{sample['id']}**, speaker `{sample['speaker_id']}`")
-        clips_container.caption(sample["text"].capitalize())
-        clips_container.audio(audio_data, sample_rate=sample_rate)
-
-        submitted_transcripts = st.session_state.setdefault("submitted_transcripts", {})
-        transcript_key = f"transcription_{sample['id']}"
-        default_transcript = submitted_transcripts.get(sample["id"], sample["text"].capitalize())
+    for i in range(start, min(start + CLIPS_PER_PAGE, len(pipeline))):
+        clip = pipeline.get(i, compressed)
+        clips_container.write(f"**{clip.sample_id}**, speaker `{clip.speaker_id}`")
+        clips_container.caption(clip.text.capitalize())
+        if clip.mime_type:
+            clips_container.audio(clip.audio, format=clip.mime_type)
+        else:
+            clips_container.audio(clip.audio, sample_rate=clip.sample_rate)
+
+        submitted_transcript = get_review_store().label("transcripts", clip.sample_id)
+        transcript_key = f"transcription_{clip.sample_id}"
+        default_transcript = submitted_transcript or clip.text.capitalize()
         clips_container.text_area("Review transcript", value=default_transcript, key=transcript_key)
 
         action_row = clips_container.container(horizontal=True, vertical_alignment="center", gap="large")
         action_row.button(
             "Submit",
-            key=f"submit_{sample['id']}",
+            key=f"submit_{clip.sample_id}",
             type="primary",
             width=120,
             on_click=submit_transcript,
-            args=(sample["id"], transcript_key, page, total_pages),
+            args=(clip.sample_id, transcript_key, page, total_pages),
         )
-        if sample["id"] in submitted_transcripts:
+        if submitted_transcript is not None:
             action_row.write("✅ Checked")
         clips_container.divider()
+    st.caption("Decoded clip cache: {hits} hits, {misses} misses, {cached_clips} clips held.".format(**pipeline.stats()))
 
 
 # ---------------------------------------------------------------------------
 # Search results (dynamic num_pages)
 # ---------------------------------------------------------------------------
+# Point at stubs/fake_github_server.py to develop and benchmark offline.
+GITHUB_API_URL = os.environ.get("GITHUB_API_URL", "https://api.github.com")
 GITHUB_REPO = "streamlit/streamlit"
 GITHUB_MAX_SEARCH_RESULTS = 1000  # GitHub search caps at 1000 results per query
 SEARCH_RESULTS_PER_PAGE = 6
 SEARCH_RESULTS_COLUMNS = 3
+# Neighbouring pages are only prefetched while this many requests are left
+# in the rate limit window, keeping the rest for pages users actually open.
+SEARCH_PREFETCH_RESERVE = 5
 
 
-@st.cache_data(show_spinner="Searching GitHub issues...")
-def search_github_issues(query: str, page: int, per_page: int) -> dict:
-    response = requests.get(
-        "https://api.github.com/search/issues",
-        params={"q": f"repo:{GITHUB_REPO} {query}".strip(), "per_page": per_page, "page": page},
-        headers={"Accept": "application/vnd.github+json"},
-        timeout=10,
-    )
-    response.raise_for_status()
-    return response.json()
+# Shared by every session, so its page cache and in-flight requests are too.
+@st.cache_resource
+def get_search_client() -> GitHubSearchClient:
+    return GitHubSearchClient(GITHUB_API_URL, GITHUB_REPO)
 
 
 def search_results_demo():
@@ -367,18 +545,34 @@ def search_results_demo():
     )
 
     query = st.text_input("Search issues", placeholder="e.g. 'pagination', 'st.chat_input'")
-    first_page = search_github_issues(query, page=1, per_page=SEARCH_RESULTS_PER_PAGE)
-    total_results = min(first_page["total_count"], GITHUB_MAX_SEARCH_RESULTS)
+    client = get_search_client()
+    try:
+        with st.spinner("Searching GitHub issues..."):
+            total_count = client.total_count(query, SEARCH_RESULTS_PER_PAGE)
+    except RateLimited as e:
+        st.warning(str(e), icon="⏳")
+        return
+    total_results = min(total_count, GITHUB_MAX_SEARCH_RESULTS)
     total_pages = max(1, -(-total_results // SEARCH_RESULTS_PER_PAGE))
 
     results_slot = st.empty()
     with st.container(horizontal_alignment="right"):
         page = st.pagination(num_pages=total_pages, key="search_page")
 
-    results = first_page if page == 1 else search_github_issues(query, page=page, per_page=SEARCH_RESULTS_PER_PAGE)
+    def load_results(page: int) -> SearchPage:
+        return client.search(query, page, SEARCH_RESULTS_PER_PAGE)
+
+    prefetcher = get_prefetcher("search")
+    try:
+        results = prefetcher.get(query, page, load_results)
+    except RateLimited as e:
+        results_slot.warning(str(e), icon="⏳")
+        return
     with results_slot.container():
-        st.write(f"{first_page['total_count']} result(s)")
-        items = results["items"]
+        st.write(f"{total_count} result(s)")
+        if results.stale:
+            st.caption(f"⏳ Rate limited by GitHub, showing results from {time.strftime('%H:%M', time.localtime(results.fetched_at))}.")
+        items = results.items
         for row_start in range(0, len(items), SEARCH_RESULTS_COLUMNS):
             row_items = items[row_start : row_start + SEARCH_RESULTS_COLUMNS]
             cols = st.columns(SEARCH_RESULTS_COLUMNS)
@@ -388,6 +582,8 @@ def search_results_demo():
                     state_icon = "🟢" if item["state"] == "open" else "🟣"
                     st.markdown(f"{state_icon} **[{kind} #{item['number']}]({item['html_url']}): {item['title']}**")
                     st.caption(f"by {item['user']['login']} · {item['comments']} comments")
+    if client.rate_remaining is None or client.rate_remaining > SEARCH_PREFETCH_RESERVE:
+        prefetcher.warm(query, page, total_pages, load_results)
 
 
 # ---------------------------------------------------------------------------
@@ -404,3 +600,8 @@ pages = [
 
 pg = st.navigation(pages)
 pg.run()
+
+if prefetchers := st.session_state.get("prefetchers"):
+    with st.sidebar:
+        st.subheader("Prefetch cache", help="Hits are page flips served from a prefetched page.")
+        st.dataframe(pd.DataFrame.from_dict({name: p.stats() for name, p in prefetchers.items()}, orient="index"))
@@ -0,0 +1,39 @@
+"""Offline stand-in for `hf-internal-testing/librispeech_asr_dummy`: synthetic FLAC tones.
+
+Same columns as the real split (``id``, ``speaker_id``, ``text`` and an
+``audio`` column of encoded bytes), so the audio review page runs without the
+Hugging Face Hub. Used by benchmarks/app_pages.py in place of
+``datasets.load_dataset``.
+"""
+
+import io
+
+import numpy as np
+import soundfile as sf
+from datasets import Audio, Dataset
+
+NUM_CLIPS = 73
+SAMPLE_RATE = 16_000
+WORDS = ["chapter", "the", "old", "house", "stood", "by", "a", "quiet", "river", "in", "winter", "light"]
+
+
+def render_clip(index: int, seconds: float = 4.0) -> bytes:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    tone = 0.2 * np.sin(2 * np.pi * (220 + 20 * (index % 12)) * t)
+    buffer = io.BytesIO()
+    sf.write(buffer, tone.astype(np.float32), SAMPLE_RATE, format="FLAC")
+    return buffer.getvalue()
+
+
+def build_dataset(num_clips: int = NUM_CLIPS) -> Dataset:
+    # Cast rather than declared up front: encoding through the Audio feature
+    # would pull in torchcodec, casting only relabels the {bytes, path} struct.
+    dataset = Dataset.from_dict(
+        {
+            "id": [f"{1272 + i % 5}-128104-{i:04d}" for i in range(num_clips)],
+            "speaker_id": [1272 + i % 5 for i in range(num_clips)],
+            "text": [" ".join(WORDS[(i + j) % len(WORDS)] for j in range(8)).upper() for i in range(num_clips)],
+            "audio": [{"bytes": render_clip(i), "path": None} for i in range(num_clips)],
+        }
+    )
+    return dataset.cast_column("audio", Audio(sampling_rate=SAMPLE_RATE))
@@ -0,0 +1,113 @@
+"""Local stand-in for GitHub's `/search/issues`, rate limit headers included.
+
+    python stubs/fake_github_server.py --port 8767 --rate-limit 10
+    GITHUB_API_URL=http://127.0.0.1:8767 streamlit run streamlit_app.py
+"""
+
+import argparse
+import json
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+RATE_LIMIT_WINDOW_SECONDS = 60
+
+
+def search_results(query: str, page: int, per_page: int) -> dict:
+    # Deterministic per query, so pages of the same query are consistent.
+    total_count = zlib.crc32(query.encode()) % 2500
+    start = (page - 1) * per_page
+    numbers = range(start + 1, min(start + per_page, total_count) + 1)
+    items = []
+    for number in numbers:
+        item = {
+            "number": number,
+            "title": f"Result {number} for {query!r}",
+            "html_url": f"https://github.com/example/repo/issues/{number}",
+            "state": "open" if number % 3 else "closed",
+            "user": {"login": f"user{number % 41}"},
+            "comments": number % 17,
+        }
+        if number % 4 == 0:
+            item["pull_request"] = {"url": f"https://api.github.com/repos/example/repo/pulls/{number}"}
+        items.append(item)
+    return {"total_count": total_count, "incomplete_results": False, "items": items}
+
+
+class FakeGitHubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        if url.path != "/search/issues":
+            self.send_error(404)
+            return
+
+        with server.lock:
+            now = time.time()
+            if now >= server.window_reset:
+                server.window_reset = now + RATE_LIMIT_WINDOW_SECONDS
+                server.window_used = 0
+            server.window_used += 1
+            remaining = max(0, server.rate_limit - server.window_used)
+            limited = server.window_used > server.rate_limit
+            server.requests[url.query] += 1
+        time.sleep(server.latency)
+
+        headers = {
+            "X-RateLimit-Limit": str(server.rate_limit),
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset": str(int(server.window_reset)),
+        }
+        if limited:
+            self.send_response(403)
+            body = json.dumps({"message": "API rate limit exceeded"}).encode()
+        else:
+            query = parse_qs(url.query)
+            body = json.dumps(
+                search_results(
+                    query.get("q", [""])[0],
+                    int(query.get("page", ["1"])[0]),
+                    int(query.get("per_page", ["30"])[0]),
+                )
+            ).encode()
+            self.send_response(200)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port: int = 0, latency: float = 0.0, rate_limit: int = 30) -> tuple[ThreadingHTTPServer, str]:
+    """Start the server on a daemon thread and return it with its base URL."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeGitHubHandler)
+    server.latency = latency
+    server.rate_limit = rate_limit
+    server.window_reset = 0.0
+    server.window_used = 0
+    server.lock = threading.Lock()
+    server.requests = Counter()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--rate-limit", type=int, default=30, help="requests allowed per minute")
+    args = parser.parse_args()
+
+    server, url = start_server(args.port, args.latency, args.rate_limit)
+    print(f"Fake GitHub search API on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,94 @@
+"""Local stand-in for the Hacker News API, serving deterministic stories and comments.
+
+    python stubs/fake_hn_server.py --port 8765 --latency 0.2
+    HN_API_URL=http://127.0.0.1:8765 streamlit run streamlit_app.py
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+NUM_STORIES = 100
+COMMENTS_PER_STORY = 20
+FIRST_STORY_ID = 1_000_000
+
+
+def story_ids() -> list[int]:
+    return [FIRST_STORY_ID + i * (COMMENTS_PER_STORY + 1) for i in range(NUM_STORIES)]
+
+
+def make_item(item_id: int) -> dict | None:
+    offset = item_id - FIRST_STORY_ID
+    if offset < 0 or offset >= NUM_STORIES * (COMMENTS_PER_STORY + 1):
+        return None
+    story_id = item_id - offset % (COMMENTS_PER_STORY + 1)
+    if item_id == story_id:
+        return {
+            "id": item_id,
+            "type": "story",
+            "by": f"author{item_id % 97}",
+            "title": f"Fake story {item_id}",
+            "descendants": COMMENTS_PER_STORY,
+            "kids": list(range(story_id + 1, story_id + 1 + COMMENTS_PER_STORY)),
+        }
+    return {
+        "id": item_id,
+        "type": "comment",
+        "by": f"commenter{item_id % 89}",
+        "parent": story_id,
+        "text": f"<p>Comment {item_id} on story {story_id}</p>",
+    }
+
+
+class FakeHNHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests[self.path] += 1
+        time.sleep(server.latency)
+
+        if self.path.rstrip("/").endswith("/topstories.json"):
+            payload = story_ids()
+        elif match := re.search(r"/item/(\d+)\.json$", self.path):
+            payload = make_item(int(match.group(1)))
+        else:
+            self.send_error(404)
+            return
+
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port: int = 0, latency: float = 0.0) -> tuple[ThreadingHTTPServer, str]:
+    """Start the server on a daemon thread and return it with its base URL."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeHNHandler)
+    server.latency = latency
+    server.lock = threading.Lock()
+    server.requests = Counter()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    args = parser.parse_args()
+
+    server, url = start_server(args.port, args.latency)
+    print(f"Fake Hacker News API on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
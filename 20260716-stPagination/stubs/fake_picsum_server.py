@@ -0,0 +1,87 @@
+"""Local stand-in for Picsum: the paginated `/v2/list` id listing and `/id/{id}/{w}/{h}` images.
+
+    python stubs/fake_picsum_server.py --port 8766 --latency 0.2
+    PICSUM_URL=http://127.0.0.1:8766 streamlit run streamlit_app.py
+"""
+
+import argparse
+import io
+import json
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from PIL import Image
+
+# Like the real service, not every id up to the max is valid.
+VALID_IDS = [i for i in range(1085) if i % 23 != 7]
+
+
+def render_image(image_id: int, width: int, height: int) -> bytes:
+    color = ((image_id * 37) % 256, (image_id * 91) % 256, (image_id * 53) % 256)
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+class FakePicsumHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        with server.lock:
+            server.requests[url.path] += 1
+        time.sleep(server.latency)
+
+        if url.path == "/v2/list":
+            query = parse_qs(url.query)
+            page = int(query.get("page", ["1"])[0])
+            limit = int(query.get("limit", ["30"])[0])
+            batch = VALID_IDS[(page - 1) * limit : page * limit]
+            body = json.dumps([{"id": str(image_id), "author": f"Author {image_id}"} for image_id in batch]).encode()
+            content_type = "application/json"
+        elif match := re.fullmatch(r"/id/(\d+)/(\d+)/(\d+)", url.path):
+            image_id, width, height = map(int, match.groups())
+            if image_id not in VALID_IDS:
+                self.send_error(404, "Image does not exist")
+                return
+            body = render_image(image_id, width, height)
+            content_type = "image/jpeg"
+        else:
+            self.send_error(404)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port: int = 0, latency: float = 0.0) -> tuple[ThreadingHTTPServer, str]:
+    """Start the server on a daemon thread and return it with its base URL."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakePicsumHandler)
+    server.latency = latency
+    server.lock = threading.Lock()
+    server.requests = Counter()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    args = parser.parse_args()
+
+    server, url = start_server(args.port, args.latency)
+    print(f"Fake Picsum on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()